@@ -0,0 +1,10 @@
+import os
+
+# os benchmarks rodam sem .env; só preenche o que estiver faltando
+os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite:///:memory:')
+os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('ALGORITHM', 'HS256')
+# os cenários logam centenas de vezes do mesmo IP; benchmarks.login_flood
+# liga o limite explicitamente
+os.environ.setdefault('LOGIN_RATE_LIMIT_IP_CAPACITY', '0')
+os.environ.setdefault('LOGIN_RATE_LIMIT_EMAIL_CAPACITY', '0')
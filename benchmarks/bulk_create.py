@@ -0,0 +1,69 @@
+"""Throughput de criação de usuários: POST /users/ x POST /users/bulk.
+
+python -m benchmarks.bulk_create --users 200 --batch-size 100
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.utils import bench_client, bench_database, emit
+
+
+def new_users(prefix: str, count: int) -> list[dict[str, str]]:
+    return [
+        {
+            'username': f'{prefix}{n}',
+            'email': f'{prefix}{n}@bench.com',
+            'password': 'bench-p@ss',
+        }
+        for n in range(count)
+    ]
+
+
+async def main(args: argparse.Namespace) -> None:
+    results: dict[str, Any] = {}
+
+    async with (
+        bench_database(0) as engine,
+        bench_client(engine) as client,
+    ):
+        start = time.perf_counter()
+        for user in new_users('single', args.users):
+            response = await client.post('/users/', json=user)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        results['single'] = {
+            'seconds': elapsed,
+            'users_per_sec': args.users / elapsed,
+        }
+
+        payload = new_users('bulk', args.users)
+        start = time.perf_counter()
+        for offset in range(0, args.users, args.batch_size):
+            response = await client.post(
+                '/users/bulk',
+                json=payload[offset : offset + args.batch_size],
+                timeout=None,
+            )
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        results['bulk'] = {
+            'seconds': elapsed,
+            'users_per_sec': args.users / elapsed,
+        }
+
+    emit({
+        'benchmark': 'bulk_create',
+        'users': args.users,
+        'batch_size': args.batch_size,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""Latência da primeira rajada de requests logo após o startup.
+
+Sobe o app pelo lifespan real (sem override de sessão) contra um SQLite
+em arquivo, com e sem prewarm do pool, e mede a rajada inicial::
+
+    python -m benchmarks.cold_start --rounds 20 --burst 15
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.utils import bench_database, emit, latency_summary
+from src.app import app
+from src.settings import get_settings
+
+
+async def cold_start(burst: int) -> tuple[float, list[float]]:
+    samples: list[float] = []
+
+    async def get_user(user_id: int) -> None:
+        start = time.perf_counter()
+        response = await client.get(f'/users/{user_id}')
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup = time.perf_counter() - start
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url='http://bench'
+        ) as client:
+            await asyncio.gather(*(get_user(n + 1) for n in range(burst)))
+
+    return startup, samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    results: dict[str, Any] = {}
+    async with bench_database(args.burst) as engine:
+        # o lifespan lê as Settings do ambiente; get_settings guarda a
+        # primeira leitura, feita com a URL em memória no import de
+        # src.app, por isso o cache_clear aqui e a cada modo
+        os.environ['DATABASE_URL'] = engine.url.render_as_string(
+            hide_password=False
+        )
+        get_settings.cache_clear()
+        # uma rodada descartada: imports e caches de compilação do
+        # SQLAlchemy não fazem parte do cold start de um processo novo
+        await cold_start(args.burst)
+
+        for prewarm in (0, args.prewarm):
+            os.environ['DATABASE_POOL_PREWARM'] = str(prewarm)
+            get_settings.cache_clear()
+            startups, samples = [], []
+            for _ in range(args.rounds):
+                startup, burst = await cold_start(args.burst)
+                startups.append(startup)
+                samples.extend(burst)
+
+            results[f'prewarm_{prewarm}'] = {
+                'startup_ms': latency_summary(startups)['p50_ms'],
+                'first_burst': latency_summary(samples),
+            }
+
+    emit({
+        'benchmark': 'cold_start',
+        'rounds': args.rounds,
+        'burst': args.burst,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--burst', type=int, default=15)
+    parser.add_argument('--prewarm', type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
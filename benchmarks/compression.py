@@ -0,0 +1,100 @@
+"""Bytes na rede e CPU por request com compressão, por limiar mínimo.
+
+Cada URL é pedida sem compressão (identity), com gzip e com brotli (se
+instalado), variando o COMPRESSION_MINIMUM_SIZE::
+
+    python -m benchmarks.compression --thresholds 0 1024 4096 --repeat 100
+
+As páginas de /users/ saem do cache de listagem depois da primeira
+request, então a CPU medida é quase só a da compressão.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from httpx import AsyncClient
+
+from benchmarks.utils import bench_client, bench_database, emit
+from src import compression
+from src.app import app
+
+URLS = (
+    '/users/?limit=10',
+    '/users/?limit=100',
+    '/users/?limit=1000',
+    '/users/1',
+    '/html',
+    '/openapi.json',
+)
+
+
+def set_minimum_size(minimum_size: int) -> None:
+    # só o CompressionMiddleware recebe minimum_size
+    for middleware in app.user_middleware:
+        if 'minimum_size' in middleware.kwargs:
+            middleware.kwargs['minimum_size'] = minimum_size
+    # a pilha de middlewares é montada de novo na próxima request
+    app.middleware_stack = None
+
+
+async def measure(
+    client: AsyncClient, url: str, encoding: str, repeat: int
+) -> dict[str, Any]:
+    headers = {'Accept-Encoding': encoding}
+    # aquece: cache de listagem, schema do OpenAPI, cache dos estáticos
+    response = await client.get(url, headers=headers)
+    response.raise_for_status()
+
+    start = time.process_time()
+    for _ in range(repeat):
+        (await client.get(url, headers=headers)).raise_for_status()
+    cpu = time.process_time() - start
+
+    return {
+        'bytes': response.num_bytes_downloaded,
+        'content_encoding': response.headers.get('Content-Encoding'),
+        'cpu_ms': cpu / repeat * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+    results: dict[str, Any] = {}
+
+    async with (
+        bench_database(args.users) as engine,
+        bench_client(engine) as client,
+    ):
+        results['identity'] = {
+            url: await measure(client, url, 'identity', args.repeat)
+            for url in URLS
+        }
+        for encoding in encodings:
+            results[encoding] = {}
+            for threshold in args.thresholds:
+                set_minimum_size(threshold)
+                results[encoding][threshold] = {
+                    url: await measure(client, url, encoding, args.repeat)
+                    for url in URLS
+                }
+
+    emit({
+        'benchmark': 'compression',
+        'users': args.users,
+        'repeat': args.repeat,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--thresholds', type=int, nargs='+', default=[0, 256, 1024, 4096]
+    )
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
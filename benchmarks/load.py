@@ -0,0 +1,202 @@
+"""Throughput e latência de cada rota, com concorrência configurável.
+
+    python -m benchmarks.load --users 10000 --requests 200 --concurrency 10
+    python -m benchmarks.load --output baseline.json
+    python -m benchmarks.load --baseline baseline.json --tolerance 0.2
+
+Com ``--baseline`` o processo termina com código 1 se alguma rota piorou
+além da tolerância (p95 maior ou req/s menor que o baseline).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from httpx import AsyncClient, Response
+
+from benchmarks.utils import (
+    BENCH_PASSWORD,
+    bench_client,
+    bench_database,
+    bench_email,
+    emit,
+    latency_summary,
+)
+from src.security import create_access_token
+
+Scenario = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+def auth_headers(n: int) -> dict[str, str]:
+    token = create_access_token(data={'sub': bench_email(n)})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def build_scenarios(users: int, requests: int) -> dict[str, Scenario]:
+    # PUT e DELETE usam faixas disjuntas de usuários: cada request altera
+    # o próprio usuário, e um usuário removido não volta
+    headers = [auth_headers(n) for n in range(users)]
+
+    async def login(client: AsyncClient, i: int) -> Response:
+        return await client.post(
+            '/auth/token',
+            data={
+                'username': bench_email(i % users),
+                'password': BENCH_PASSWORD,
+            },
+        )
+
+    async def refresh(client: AsyncClient, i: int) -> Response:
+        return await client.post(
+            '/auth/refresh-token', headers=headers[i % users]
+        )
+
+    async def list_users(client: AsyncClient, i: int) -> Response:
+        return await client.get('/users/', params={'limit': 100})
+
+    # ids são sequenciais a partir de 1 no banco semeado
+    async def get_user(client: AsyncClient, i: int) -> Response:
+        return await client.get(f'/users/{i % users + 1}')
+
+    async def update_user(client: AsyncClient, i: int) -> Response:
+        return await client.put(
+            f'/users/{i + 1}',
+            headers=headers[i],
+            json={
+                'username': f'updated{i}',
+                'email': bench_email(i),
+                'password': BENCH_PASSWORD,
+            },
+        )
+
+    async def delete_user(client: AsyncClient, i: int) -> Response:
+        n = users - requests + i
+        return await client.delete(f'/users/{n + 1}', headers=headers[n])
+
+    return {
+        'POST /auth/token': login,
+        'POST /auth/refresh-token': refresh,
+        'GET /users/': list_users,
+        'GET /users/{user_id}': get_user,
+        'PUT /users/{user_id}': update_user,
+        'DELETE /users/{user_id}': delete_user,
+    }
+
+
+async def run_scenario(
+    client: AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> dict[str, float]:
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    samples: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await scenario(client, i)
+            samples.append(time.perf_counter() - start)
+            errors += response.is_error
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        **latency_summary(samples),
+        'rps': requests / elapsed,
+        'errors': errors,
+    }
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Rotas que pioraram em relação ao baseline."""
+    regressions = []
+    for route, result in report['results'].items():
+        base = baseline['results'].get(route)
+        if base is None:
+            continue
+
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{route}: p95 {result["p95_ms"]:.1f}ms '
+                f'(baseline {base["p95_ms"]:.1f}ms)'
+            )
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(
+                f'{route}: {result["rps"]:.1f} req/s '
+                f'(baseline {base["rps"]:.1f} req/s)'
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    scenarios = build_scenarios(args.users, args.requests)
+    selected = args.routes or list(scenarios)
+
+    results = {}
+    async with (
+        bench_database(args.users) as engine,
+        bench_client(engine) as client,
+    ):
+        for route in selected:
+            results[route] = await run_scenario(
+                client, scenarios[route], args.requests, args.concurrency
+            )
+
+    return {
+        'benchmark': 'load',
+        'users': args.users,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument(
+        '--routes',
+        nargs='+',
+        metavar='ROUTE',
+        help='ex.: "GET /users/" "POST /auth/token" (padrão: todas)',
+    )
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # PUT e DELETE precisam de um usuário distinto por request
+    if args.users < 2 * args.requests:
+        parser.error('--users must be at least twice --requests')
+
+    report = asyncio.run(main(args))
+    emit(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'regression: {regression}', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
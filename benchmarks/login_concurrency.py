@@ -0,0 +1,123 @@
+"""Throughput de login e latência de GET /users com logins concorrentes.
+
+Compara o argon2 rodando dentro do event loop (``inline``, como era antes)
+com o pool de hashing (``pool``)::
+
+    python -m benchmarks.login_concurrency --logins 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+from unittest.mock import patch
+
+from httpx import AsyncClient
+
+from benchmarks.utils import (
+    BENCH_PASSWORD,
+    bench_client,
+    bench_database,
+    bench_email,
+    emit,
+    latency_summary,
+)
+from src.routers import auth
+from src.security import verify_and_update_password
+
+
+async def verify_password_inline(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return verify_and_update_password(plain_password, hashed_password)
+
+
+async def login_worker(
+    client: AsyncClient, queue: asyncio.Queue[int], users: int
+) -> None:
+    while True:
+        try:
+            n = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        response = await client.post(
+            '/auth/token',
+            data={
+                'username': bench_email(n % users),
+                'password': BENCH_PASSWORD,
+            },
+        )
+        response.raise_for_status()
+
+
+async def probe_users(
+    client: AsyncClient, stop: asyncio.Event, samples: list[float]
+) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get('/users/', params={'limit': 10})
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        await asyncio.sleep(0.005)
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> dict[str, Any]:
+    async with (
+        bench_database(args.users) as engine,
+        bench_client(engine) as client,
+    ):
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for n in range(args.logins):
+            queue.put_nowait(n)
+
+        stop = asyncio.Event()
+        samples: list[float] = []
+
+        hashing: AbstractContextManager[Any] = nullcontext()
+        if mode == 'inline':
+            hashing = patch.object(
+                auth,
+                'verify_and_update_password_async',
+                verify_password_inline,
+            )
+
+        with hashing:
+            probe = asyncio.create_task(probe_users(client, stop, samples))
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    login_worker(client, queue, args.users)
+                    for _ in range(args.concurrency)
+                )
+            )
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await probe
+
+    return {
+        'logins': args.logins,
+        'seconds': elapsed,
+        'logins_per_sec': args.logins / elapsed,
+        'get_users': latency_summary(samples),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    modes = ['inline', 'pool'] if args.mode == 'both' else [args.mode]
+    emit({
+        'benchmark': 'login_concurrency',
+        'concurrency': args.concurrency,
+        'results': {mode: await run_mode(mode, args) for mode in modes},
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument(
+        '--mode', choices=['inline', 'pool', 'both'], default='both'
+    )
+    asyncio.run(main(parser.parse_args()))
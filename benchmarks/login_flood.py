@@ -0,0 +1,154 @@
+"""Latência de GET /users durante uma enxurrada de logins inválidos.
+
+Compara o app sem carga (``idle``), sob credential stuffing sem limite
+de tentativas (``unthrottled``) e com o limite padrão (``throttled``)::
+
+    python -m benchmarks.login_flood --seconds 30 --rate 50
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+from unittest.mock import patch
+
+from httpx import AsyncClient
+
+from benchmarks.utils import (
+    bench_client,
+    bench_database,
+    bench_email,
+    emit,
+    latency_summary,
+)
+from src.ratelimit import LoginRateLimiter, MemoryTokenBucketBackend
+from src.routers import auth
+from src.settings import Settings
+
+MODES = ('idle', 'unthrottled', 'throttled')
+
+
+def default_rate_limiter() -> LoginRateLimiter:
+    # os benchmarks desligam o limite via ambiente; aqui valem os padrões
+    defaults = {
+        name: field.default for name, field in Settings.model_fields.items()
+    }
+    return LoginRateLimiter(
+        MemoryTokenBucketBackend(
+            maxsize=defaults['LOGIN_RATE_LIMIT_MAX_KEYS']
+        ),
+        ip_capacity=defaults['LOGIN_RATE_LIMIT_IP_CAPACITY'],
+        ip_refill_rate=defaults['LOGIN_RATE_LIMIT_IP_REFILL_RATE'],
+        email_capacity=defaults['LOGIN_RATE_LIMIT_EMAIL_CAPACITY'],
+        email_refill_rate=defaults['LOGIN_RATE_LIMIT_EMAIL_REFILL_RATE'],
+    )
+
+
+async def flood(
+    client: AsyncClient,
+    stop: asyncio.Event,
+    args: argparse.Namespace,
+    statuses: Counter[str],
+) -> None:
+    # taxa fixa de tentativas, como um atacante externo: quem espera a
+    # resposta não é o atacante, e sim os outros clientes
+    async def attempt(n: int) -> None:
+        try:
+            response = await client.post(
+                '/auth/token',
+                data={
+                    'username': bench_email(n % args.users),
+                    'password': 'wrong',
+                },
+            )
+        # sem limite, o pool de conexões esgota (sqlalchemy TimeoutError)
+        except Exception:
+            statuses['error'] += 1
+            return
+        statuses[str(response.status_code)] += 1
+
+    pending = set()
+    n = 0
+    while not stop.is_set():
+        task = asyncio.create_task(attempt(n))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        n += 1
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.gather(*pending)
+
+
+async def probe_users(
+    client: AsyncClient,
+    stop: asyncio.Event,
+    samples: list[float],
+    statuses: Counter[str],
+) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.get('/users/', params={'limit': 10})
+        except Exception:
+            statuses['error'] += 1
+        else:
+            statuses[str(response.status_code)] += 1
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> dict[str, Any]:
+    limiter: AbstractContextManager[Any] = nullcontext()
+    if mode == 'throttled':
+        limiter = patch.object(
+            auth, 'login_rate_limiter', default_rate_limiter()
+        )
+
+    async with (
+        bench_database(args.users) as engine,
+        bench_client(engine) as client,
+    ):
+        stop = asyncio.Event()
+        samples: list[float] = []
+        statuses: Counter[str] = Counter()
+        probe_statuses: Counter[str] = Counter()
+
+        with limiter:
+            tasks = [
+                asyncio.create_task(
+                    probe_users(client, stop, samples, probe_statuses)
+                )
+            ]
+            if mode != 'idle':
+                tasks.append(
+                    asyncio.create_task(flood(client, stop, args, statuses))
+                )
+            await asyncio.sleep(args.seconds)
+            stop.set()
+            await asyncio.gather(*tasks)
+
+    return {
+        'login_attempts': dict(statuses),
+        'get_users': {
+            **latency_summary(samples),
+            'statuses': dict(probe_statuses),
+        },
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    emit({
+        'benchmark': 'login_flood',
+        'seconds': args.seconds,
+        'attempts_per_second': args.rate,
+        'results': {mode: await run_mode(mode, args) for mode in MODES},
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--rate', type=float, default=50.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""Latência de uma página profunda de GET /users: offset x cursor.
+
+python -m benchmarks.pagination --users 1000000 --page 1000 --limit 100
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from httpx import AsyncClient
+
+from benchmarks.utils import (
+    bench_client,
+    bench_database,
+    disable_list_cache,
+    emit,
+    latency_summary,
+)
+from src.models.pagination import encode_cursor
+
+
+async def time_page(
+    client: AsyncClient, params: dict[str, Any], repeat: int
+) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get('/users/', params=params)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    disable_list_cache()
+    skipped = (args.page - 1) * args.limit
+
+    async with (
+        bench_database(args.users) as engine,
+        bench_client(engine) as client,
+    ):
+        offset = await time_page(
+            client, {'offset': skipped, 'limit': args.limit}, args.repeat
+        )
+        # ids são sequenciais a partir de 1 no banco semeado
+        cursor = await time_page(
+            client,
+            {'cursor': encode_cursor(skipped), 'limit': args.limit},
+            args.repeat,
+        )
+
+    emit({
+        'benchmark': 'pagination',
+        'users': args.users,
+        'page': args.page,
+        'limit': args.limit,
+        'results': {
+            'offset': latency_summary(offset),
+            'cursor': latency_summary(cursor),
+        },
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--page', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
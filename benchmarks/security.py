@@ -0,0 +1,146 @@
+"""Custo de CPU das funções de src.security e de Settings().
+
+Mede hash/verify do argon2 em vários conjuntos de parâmetros, emissão e
+validação de JWT com HS256, ES256 e EdDSA, e a construção de Settings::
+
+    python -m benchmarks.security --repeat 20 --output security.json
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt import decode
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from benchmarks.utils import emit, latency_summary
+from src import security
+from src.settings import Settings, get_settings
+
+# memory_cost em KiB
+ARGON2_PARAMETERS = {
+    'owasp-minimum': {'time_cost': 2, 'memory_cost': 19_456, 'parallelism': 1},
+    'low-memory': {'time_cost': 3, 'memory_cost': 12_288, 'parallelism': 1},
+    'recommended': {'time_cost': 3, 'memory_cost': 65_536, 'parallelism': 4},
+    'high': {'time_cost': 4, 'memory_cost': 131_072, 'parallelism': 4},
+}
+PASSWORD = 'bench-p@ss'
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    summary = latency_summary(samples)
+    summary['ops_per_s'] = repeat / sum(samples) if sum(samples) else 0.0
+    return summary
+
+
+def bench_argon2(repeat: int) -> dict[str, Any]:
+    results = {}
+    for name, parameters in ARGON2_PARAMETERS.items():
+        hasher = Argon2Hasher(
+            time_cost=parameters['time_cost'],
+            memory_cost=parameters['memory_cost'],
+            parallelism=parameters['parallelism'],
+        )
+        context = PasswordHash((hasher,))
+        with patch.object(security, 'get_password_context', lambda: context):
+            hashed = security.get_password_hash(PASSWORD)
+            results[name] = {
+                'parameters': parameters,
+                'hash': measure(
+                    lambda: security.get_password_hash(PASSWORD), repeat
+                ),
+                'verify': measure(
+                    lambda: security.verify_password(PASSWORD, hashed),
+                    repeat,
+                ),
+            }
+    return results
+
+
+def signing_keys() -> dict[str, tuple[str, str]]:
+    """Chave de assinatura e de verificação (PEM) por algoritmo."""
+    pem = serialization.Encoding.PEM
+    keys = {'HS256': ('benchmark-secret', 'benchmark-secret')}
+    for algorithm, private_key in (
+        ('ES256', ec.generate_private_key(ec.SECP256R1())),
+        ('EdDSA', ed25519.Ed25519PrivateKey.generate()),
+    ):
+        private_pem = private_key.private_bytes(
+            pem,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = (
+            private_key.public_key()
+            .public_bytes(pem, serialization.PublicFormat.SubjectPublicKeyInfo)
+            .decode()
+        )
+        keys[algorithm] = (private_pem, public_pem)
+    return keys
+
+
+def bench_jwt(repeat: int) -> dict[str, Any]:
+    results = {}
+    for algorithm, (private_key, public_key) in signing_keys().items():
+        settings = security.settings.model_copy(
+            update={'SECRET_KEY': private_key, 'ALGORITHM': algorithm}
+        )
+        with patch.object(security, 'settings', settings):
+            token = security.create_access_token({'sub': 'bench@bench.com'})
+            results[algorithm] = {
+                'token_bytes': len(token),
+                'create_access_token': measure(
+                    lambda: security.create_access_token({
+                        'sub': 'bench@bench.com'
+                    }),
+                    repeat,
+                ),
+                # mesma chamada feita em get_current_user
+                'decode': measure(
+                    lambda: decode(token, public_key, algorithms=[algorithm]),
+                    repeat,
+                ),
+            }
+    return results
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        'benchmark': 'security',
+        'repeat': args.repeat,
+        'results': {
+            'argon2': bench_argon2(args.repeat),
+            'jwt': bench_jwt(args.jwt_repeat),
+            # lê variáveis de ambiente e o .env a cada instância
+            'settings': measure(Settings, args.jwt_repeat),
+            'get_settings': measure(get_settings, args.jwt_repeat),
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--jwt-repeat', type=int, default=2000)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    report = main(args)
+    emit(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,95 @@
+"""CPU por página de GET /users: ORM + response_model x caminho rápido.
+
+O caminho antigo (objetos do ORM validados de novo pelo response_model)
+é montado aqui em /legacy/users/ só para comparação::
+
+    python -m benchmarks.serialization --limits 10 100 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Query
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from benchmarks.utils import (
+    bench_client,
+    bench_database,
+    disable_list_cache,
+    emit,
+)
+from src.app import app
+from src.database import get_session
+from src.models.pagination import FilterPage
+from src.models.user import ListUserResponse, User
+
+legacy = APIRouter(prefix='/legacy/users')
+
+
+@legacy.get('/', response_model=ListUserResponse)
+async def legacy_users_list(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    filter_users: Annotated[FilterPage, Query()],
+) -> Any:
+    users = await session.scalars(
+        select(User)
+        .order_by(col(User.id))
+        .offset(filter_users.offset)
+        .limit(filter_users.limit)
+    )
+    return {'users': users.all()}
+
+
+async def cpu_per_page(
+    client: AsyncClient, url: str, limit: int, repeat: int
+) -> float:
+    """Milissegundos de CPU do processo por requisição."""
+    # aquece caches (statement cache do SQLAlchemy, schemas do pydantic)
+    (await client.get(url, params={'limit': limit})).raise_for_status()
+
+    start = time.process_time()
+    for _ in range(repeat):
+        response = await client.get(url, params={'limit': limit})
+        response.raise_for_status()
+    return (time.process_time() - start) / repeat * 1000
+
+
+async def main(args: argparse.Namespace) -> None:
+    disable_list_cache()
+    app.include_router(legacy)
+
+    results = {}
+    async with (
+        bench_database(max(args.limits)) as engine,
+        bench_client(engine) as client,
+    ):
+        for limit in args.limits:
+            results[limit] = {
+                'legacy_cpu_ms': await cpu_per_page(
+                    client, '/legacy/users/', limit, args.repeat
+                ),
+                'fast_cpu_ms': await cpu_per_page(
+                    client, '/users/', limit, args.repeat
+                ),
+            }
+
+    emit({
+        'benchmark': 'serialization',
+        'repeat': args.repeat,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--limits', type=int, nargs='+', default=[10, 100, 1000]
+    )
+    parser.add_argument('--repeat', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+import json
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlmodel import SQLModel
+
+from src.app import app
+from src.cache import MemoryResponseCache
+from src.database import get_session
+from src.models.user import User
+from src.routers import users
+from src.security import get_password_hash
+
+BENCH_PASSWORD = 'bench-p@ss'
+
+
+def bench_email(n: int) -> str:
+    return f'bench{n}@bench.com'
+
+
+async def seed_users(
+    engine: AsyncEngine, count: int, batch_size: int = 10_000
+) -> None:
+    # um único hash para todos: semear não deve medir o argon2
+    password_hash = get_password_hash(BENCH_PASSWORD)
+
+    async with engine.begin() as conn:
+        for start in range(0, count, batch_size):
+            stop = min(count, start + batch_size)
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        'username': f'bench{n}',
+                        'email': bench_email(n),
+                        'password': password_hash,
+                    }
+                    for n in range(start, stop)
+                ],
+            )
+
+
+@asynccontextmanager
+async def bench_database(users: int) -> AsyncIterator[AsyncEngine]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{Path(tmp) / "bench.db"}'
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        await seed_users(engine, users)
+
+        try:
+            yield engine
+        finally:
+            await engine.dispose()
+
+
+def disable_list_cache() -> None:
+    """Sem isso, toda request depois da primeira sai do cache de listagem."""
+    users.list_cache = MemoryResponseCache(maxsize=0, max_bytes=0, ttl=0)
+
+
+@asynccontextmanager
+async def bench_client(engine: AsyncEngine) -> AsyncIterator[AsyncClient]:
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_session_override() -> AsyncIterator[AsyncSession]:
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url='http://bench'
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    """Resumo em milissegundos de amostras medidas em segundos."""
+    return {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': max(samples, default=0.0) * 1000,
+    }
+
+
+def emit(report: dict[str, Any]) -> None:
+    print(json.dumps(report, indent=2))
@@ -8,7 +8,7 @@ from sqlalchemy import pool
 
 from alembic import context
 from sqlmodel import SQLModel
-from src.settings import Settings
+from src.settings import get_settings
 import pathlib
 import importlib.util
 import sys
@@ -37,7 +37,7 @@ for py_file in models_dir.glob('*.py'):
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option('sqlalchemy.url', Settings().DATABASE_URL)
+config.set_main_option('sqlalchemy.url', get_settings().DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -1,14 +1,51 @@
 # mypy: disable-error-code="no-untyped-def"
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
+
+from src.compression import CompressionMiddleware
+from src.database import db, pool_stats
+from src.diagnostics import DiagnosticsMiddleware
+from src.metrics import MetricsMiddleware, metrics
+from src.routers import auth, tasks, users
+from src.security import (
+    password_hash_pool,
+    principal_cache,
+    principal_lookups,
+)
+from src.settings import get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    await db.open(settings)
+    yield
+    # o servidor já esperou as requests em andamento; aqui só sobram
+    # conexões de respostas em streaming
+    await db.close(settings.DATABASE_DRAIN_TIMEOUT)
+    password_hash_pool.shutdown()
 
-from src.routers import auth, users
 
-app = FastAPI()
+settings = get_settings()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(DiagnosticsMiddleware)
+# a última adicionada é a mais externa: comprime o que as outras deixaram
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    static_paths=settings.COMPRESSION_STATIC_PATHS,
+)
 
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(tasks.router)
 
 
 @app.get('/')
@@ -16,6 +53,33 @@ async def root() -> dict[str, str]:
     return {'message': 'Hello World!'}
 
 
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> str:
+    gauges: dict[str, float] = {
+        f'principal_cache_{name}': value
+        for name, value in principal_cache.stats().items()
+    }
+    gauges.update({
+        f'users_list_cache_{name}': value
+        for name, value in users.list_cache.stats().items()
+    })
+    # coalesced = consultas economizadas pelo single-flight
+    for prefix, lookups in (
+        ('principal_lookups', principal_lookups),
+        ('user_lookups', users.user_lookups),
+        ('user_version_lookups', users.user_version_lookups),
+    ):
+        gauges.update({
+            f'{prefix}_{name}': value
+            for name, value in lookups.stats().items()
+        })
+    gauges.update({
+        f'db_pool_{name}': value for name, value in pool_stats().items()
+    })
+
+    return metrics.render(gauges)
+
+
 @app.get('/html', response_class=HTMLResponse)
 async def html() -> str:
     return """
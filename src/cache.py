@@ -0,0 +1,166 @@
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+
+class TTLCache[K, V]:
+    """Cache LRU em memória com tempo de vida por entrada."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._removed(value)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+
+        self.invalidate(key)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._stored(value)
+        while self._data and self._full():
+            _, (_, evicted) = self._data.popitem(last=False)
+            self._removed(evicted)
+
+    def invalidate(self, key: K) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._removed(item[1])
+
+    def invalidate_all(self) -> None:
+        self._data.clear()
+
+    def clear(self) -> None:
+        self.invalidate_all()
+        self.hits = self.misses = 0
+
+    # ganchos para subclasses que contabilizam mais que o número de entradas
+    def _stored(self, value: V) -> None:
+        pass
+
+    def _removed(self, value: V) -> None:
+        pass
+
+    def _full(self) -> bool:
+        return len(self._data) > self.maxsize
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class SizedTTLCache(TTLCache[str, bytes]):
+    """TTLCache que também limita a soma dos tamanhos dos valores."""
+
+    def __init__(self, *, maxsize: int, max_bytes: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+
+    def set(self, key: str, value: bytes) -> None:
+        # maior que o limite inteiro: só esvaziaria o cache
+        if len(value) <= self.max_bytes:
+            super().set(key, value)
+
+    def invalidate_all(self) -> None:
+        super().invalidate_all()
+        self.size_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **super().stats(),
+            'bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def _stored(self, value: bytes) -> None:
+        self.size_bytes += len(value)
+
+    def _removed(self, value: bytes) -> None:
+        self.size_bytes -= len(value)
+
+    def _full(self) -> bool:
+        return super()._full() or self.size_bytes > self.max_bytes
+
+
+class ResponseCacheBackend(Protocol):
+    """Guarda respostas já codificadas; trocável por um store compartilhado.
+
+    A geração faz parte da chave de quem usa o cache: incrementá-la
+    invalida de uma vez tudo o que foi gravado antes.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes) -> None: ...
+
+    async def generation(self) -> int: ...
+
+    async def bump_generation(self) -> None: ...
+
+    async def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class MemoryResponseCache:
+    """Cache LRU em memória, limitado em entradas, em bytes e no tempo.
+
+    A geração só é incrementada no processo que fez a escrita: com vários
+    workers, o ttl é o atraso máximo com que os outros enxergam a mudança.
+    """
+
+    def __init__(self, *, maxsize: int, max_bytes: int, ttl: float) -> None:
+        self._entries = SizedTTLCache(
+            maxsize=maxsize, max_bytes=max_bytes, ttl=ttl
+        )
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def bump_generation(self) -> None:
+        self._generation += 1
+        # em memória dá para liberar já as entradas da geração anterior
+        self._entries.invalidate_all()
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
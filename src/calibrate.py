@@ -0,0 +1,105 @@
+"""Calibra o custo do argon2 para a latência alvo nesta máquina.
+
+    python -m src.calibrate --target-ms 250 --env-file .env
+
+Mantém a memória pedida e sobe o time_cost enquanto o hash couber no
+alvo; se nem time_cost=1 couber, reduz a memória até o mínimo da OWASP.
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from src.settings import get_settings
+
+MIN_MEMORY_COST = 19_456  # KiB
+MAX_TIME_COST = 10
+
+Measure = Callable[[int, int, int], float]
+
+
+def measure_hash(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    """Mediana, em segundos, de alguns hashes com esses parâmetros."""
+    hasher = Argon2Hasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        hasher.hash('calibration-p@ss')
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def calibrate(
+    target: float,
+    *,
+    memory_cost: int,
+    parallelism: int,
+    measure: Measure = measure_hash,
+) -> dict[str, int]:
+    while (
+        measure(1, memory_cost, parallelism) > target
+        and memory_cost // 2 >= MIN_MEMORY_COST
+    ):
+        memory_cost //= 2
+
+    time_cost = 1
+    while (
+        time_cost < MAX_TIME_COST
+        and measure(time_cost + 1, memory_cost, parallelism) <= target
+    ):
+        time_cost += 1
+
+    return {
+        'ARGON2_TIME_COST': time_cost,
+        'ARGON2_MEMORY_COST': memory_cost,
+        'ARGON2_PARALLELISM': parallelism,
+    }
+
+
+def write_env(path: Path, values: dict[str, int]) -> None:
+    """Atualiza (ou acrescenta) as variáveis no arquivo .env."""
+    lines = path.read_text().splitlines() if path.exists() else []
+    pending = dict(values)
+    for i, line in enumerate(lines):
+        name = line.split('=', 1)[0].strip()
+        if name in pending:
+            lines[i] = f'{name}={pending.pop(name)}'
+    lines.extend(f'{name}={value}' for name, value in pending.items())
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--target-ms', type=float, default=250.0)
+    parser.add_argument(
+        '--memory-cost', type=int, default=settings.ARGON2_MEMORY_COST
+    )
+    parser.add_argument(
+        '--parallelism', type=int, default=settings.ARGON2_PARALLELISM
+    )
+    parser.add_argument('--env-file', type=Path)
+    args = parser.parse_args()
+
+    values = calibrate(
+        args.target_ms / 1000,
+        memory_cost=args.memory_cost,
+        parallelism=args.parallelism,
+    )
+    for name, value in values.items():
+        print(f'{name}={value}')
+
+    if args.env_file:
+        write_env(args.env_file, values)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import importlib
+import zlib
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli é opcional: tenta o binding em C e depois o em cffi
+brotli: Any = None
+for _module in ('brotli', 'brotlicffi'):
+    try:
+        brotli = importlib.import_module(_module)
+        break
+    except ImportError:
+        pass
+
+GZIP_MAX_LEVEL = 9
+BROTLI_MAX_QUALITY = 11
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+})
+NO_BODY_STATUSES = frozenset({204, 304})
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes, *, more: bool) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # 16 + MAX_WBITS: cabeçalho e rodapé gzip em vez de zlib
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes, *, more: bool) -> bytes:
+        # Z_SYNC_FLUSH entrega já o que foi comprimido, sem esperar o fim
+        flush_mode = zlib.Z_SYNC_FLUSH if more else zlib.Z_FINISH
+        return self._compressor.compress(data) + self._compressor.flush(
+            flush_mode
+        )
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, *, more: bool) -> bytes:
+        chunk: bytes = self._compressor.process(data)
+        tail: bytes = (
+            self._compressor.flush() if more else self._compressor.finish()
+        )
+        return chunk + tail
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codificações aceitas pelo cliente, sem as marcadas com q=0."""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    # brotli comprime melhor que gzip no mesmo tempo, quando disponível
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and accepted & {'br', '*'}:
+        return 'br'
+    if accepted & {'gzip', '*'}:
+        return 'gzip'
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return (
+        media_type.startswith('text/')
+        or media_type.endswith('+json')
+        or media_type in COMPRESSIBLE_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """Comprime em gzip ou brotli conforme o Accept-Encoding.
+
+    Respostas em streaming são comprimidas pedaço a pedaço, sem juntar o
+    corpo. As de ``static_paths`` são comprimidas uma vez, no nível
+    máximo, e reaproveitadas enquanto o corpo não mudar.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        static_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.static_paths = frozenset(static_paths)
+        # (path, codificação) -> (corpo original, corpo comprimido)
+        self.static_cache: dict[tuple[str, str], tuple[bytes, bytes]] = {}
+
+    def encoder(self, encoding: str, *, static: bool = False) -> Encoder:
+        if encoding == 'br':
+            return BrotliEncoder(
+                BROTLI_MAX_QUALITY if static else self.brotli_quality
+            )
+        return GzipEncoder(GZIP_MAX_LEVEL if static else self.gzip_level)
+
+    def compress_static(self, path: str, encoding: str, body: bytes) -> bytes:
+        cached = self.static_cache.get((path, encoding))
+        if cached is not None and cached[0] == body:
+            return cached[1]
+
+        compressed = self.encoder(encoding, static=True).compress(
+            body, more=False
+        )
+        self.static_cache[path, encoding] = (body, compressed)
+        return compressed
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get('accept-encoding', '')
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope['path']
+        static_path = (
+            path
+            if scope['method'] == 'GET' and path in self.static_paths
+            else None
+        )
+        start_message: Message | None = None
+        encoder: Encoder | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder
+            if message['type'] == 'http.response.start':
+                # só decide ao ver o primeiro pedaço do corpo
+                start_message = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                encoder = await self.start_response(
+                    start, message, send, encoding, static_path
+                )
+                if encoder is None:
+                    return
+            elif encoder is None:
+                await send(message)
+                return
+
+            more_body = message.get('more_body', False)
+            await send({
+                'type': 'http.response.body',
+                'body': encoder.compress(
+                    message.get('body', b''), more=more_body
+                ),
+                'more_body': more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
+
+    async def start_response(
+        self,
+        start: Message,
+        message: Message,
+        send: Send,
+        encoding: str,
+        static_path: str | None,
+    ) -> Encoder | None:
+        """Envia o início da resposta e devolve o encoder do streaming.
+
+        Sem encoder, a resposta já saiu inteira (comprimida de uma vez ou
+        como veio) e o que vier depois passa direto.
+        """
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        headers = MutableHeaders(scope=start)
+
+        encoder = None
+        compressed = None
+        if self.should_compress(start['status'], headers):
+            if more_body:
+                encoder = self.encoder(encoding)
+            elif static_path is not None:
+                compressed = self.compress_static(static_path, encoding, body)
+            elif len(body) >= self.minimum_size:
+                compressed = self.encoder(encoding).compress(body, more=False)
+
+        if encoder is None and (
+            compressed is None or len(compressed) >= len(body)
+        ):
+            await send(start)
+            await send(message)
+            return None
+
+        headers['Content-Encoding'] = encoding
+        headers.add_vary_header('Accept-Encoding')
+        # o corpo mudou de bytes: a ETag deixa de ser forte
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = f'W/{etag}'
+
+        if compressed is not None:
+            headers['Content-Length'] = str(len(compressed))
+            await send(start)
+            await send({'type': 'http.response.body', 'body': compressed})
+            return None
+
+        del headers['Content-Length']
+        await send(start)
+        return encoder
+
+    @staticmethod
+    def should_compress(status: int, headers: MutableHeaders) -> bool:
+        return (
+            status not in NO_BODY_STATUSES
+            and 'content-encoding' not in headers
+            and is_compressible(headers.get('content-type', ''))
+        )
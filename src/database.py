@@ -1,14 +1,263 @@
 # mypy: disable-error-code="no-untyped-def"
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from functools import partial
+from itertools import count
+from typing import Any
 
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    QueuePool,
+)
+from sqlmodel import SQLModel
+
+from src import diagnostics, metrics
 from src.settings import Settings
 
-# evita erro Missing named argument "DATABASE_URL" for "Settings"Mypycall-arg
-# erro exigi  DATABASE_URL na inicialização da classe
-# apesar de não ser necessário
-engine = create_async_engine(Settings().DATABASE_URL)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Pool que mede quanto cada checkout esperou por uma conexão."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_overflow = kwargs.get('max_overflow', 10)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    url = make_url(settings.DATABASE_URL)
+
+    # SQLite em memória usa StaticPool, que não aceita dimensionamento
+    if url.get_backend_name() == 'sqlite' and url.database in {
+        None,
+        '',
+        ':memory:',
+    }:
+        return {}
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def set_sqlite_pragmas(settings: Settings, dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}')
+    cursor.execute(f'PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}')
+    cursor.execute(f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT:d}')
+    cursor.execute(f'PRAGMA cache_size={settings.SQLITE_CACHE_SIZE:d}')
+    # o SQLite só respeita ON DELETE CASCADE com foreign_keys ligado
+    cursor.execute(f'PRAGMA foreign_keys={settings.SQLITE_FOREIGN_KEYS:d}')
+    cursor.close()
+
+
+def build_engine(settings: Settings) -> AsyncEngine:
+    new_engine = create_async_engine(
+        settings.DATABASE_URL, **engine_options(settings)
+    )
+
+    if new_engine.dialect.name == 'sqlite':
+        event.listen(
+            new_engine.sync_engine,
+            'connect',
+            partial(set_sqlite_pragmas, settings),
+        )
+
+    metrics.instrument_engine(new_engine)
+    diagnostics.instrument_engine(new_engine, settings)
+
+    return new_engine
+
+
+async def prewarm(target: AsyncEngine, connections: int) -> None:
+    """Abre conexões do pool e roda uma query antes da primeira request."""
+    if not isinstance(target.pool, QueuePool):
+        # StaticPool (SQLite em memória) tem uma conexão só
+        connections = min(connections, 1)
+    else:
+        connections = min(connections, target.pool.size())
+
+    # todas abertas ao mesmo tempo; ao sair, voltam ociosas para o pool
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            conn = await stack.enter_async_context(target.connect())
+            await conn.execute(text('SELECT 1'))
+
+
+async def drain(target: AsyncEngine, timeout: float) -> None:
+    """Espera as conexões em uso voltarem ao pool e fecha o engine."""
+    deadline = time.monotonic() + timeout
+    pool = target.pool
+    while (
+        isinstance(pool, QueuePool)
+        and pool.checkedout()
+        and time.monotonic() < deadline
+    ):
+        await asyncio.sleep(0.05)
+    await target.dispose()
+
+
+class Database:
+    """Engines do primário e das réplicas, abertos no lifespan do app."""
+
+    def __init__(self) -> None:
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.read_session_factories: list[
+            async_sessionmaker[AsyncSession]
+        ] = []
+        self.replica_counter = count()
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        factories = [self.session_factory, *self.read_session_factories]
+        return [f.kw['bind'] for f in factories if f is not None]
+
+    async def open(self, settings: Settings) -> None:
+        self.engine = build_engine(settings)
+        self.session_factory = async_sessionmaker(
+            self.engine, expire_on_commit=False
+        )
+        self.read_session_factories = [
+            async_sessionmaker(
+                build_engine(
+                    settings.model_copy(update={'DATABASE_URL': url})
+                ),
+                expire_on_commit=False,
+            )
+            for url in settings.READ_DATABASE_URLS
+        ]
+
+        await asyncio.gather(
+            *(
+                prewarm(target, settings.DATABASE_POOL_PREWARM)
+                for target in self.engines
+            )
+        )
+
+    async def close(self, timeout: float) -> None:
+        engines = self.engines
+        self.engine = self.session_factory = None
+        self.read_session_factories = []
+        await asyncio.gather(*(drain(target, timeout) for target in engines))
+
+    def sessions(self) -> async_sessionmaker[AsyncSession]:
+        if self.session_factory is None:
+            raise RuntimeError('Database is not open')
+        return self.session_factory
+
+
+db = Database()
+
+
+def pool_stats(target: AsyncEngine | None = None) -> dict[str, float]:
+    target = target or db.engine
+    if target is None or not isinstance(
+        pool := target.pool, InstrumentedQueuePool
+    ):
+        return {}
+
+    capacity = pool.size() + max(pool.max_overflow, 0)
+    return {
+        'size': pool.size(),
+        'capacity': capacity,
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'saturation': pool.checkedout() / capacity if capacity else 0.0,
+        'checkouts': pool.checkouts,
+        'wait_seconds_total': pool.wait_total,
+        'wait_seconds_max': pool.wait_max,
+    }
+
+
+def violated_constraint(err: IntegrityError, dialect_name: str) -> str | None:
+    """Nome do índice/constraint que causou o IntegrityError."""
+    if dialect_name == 'postgresql':
+        # asyncpg guarda o erro original em __cause__, psycopg em .diag
+        for source in (
+            err.orig,
+            getattr(err.orig, '__cause__', None),
+            getattr(err.orig, 'diag', None),
+        ):
+            if name := getattr(source, 'constraint_name', None):
+                return str(name)
+        return None
+
+    if dialect_name == 'sqlite':
+        # o SQLite só informa as colunas:
+        # 'UNIQUE constraint failed: users.email'
+        prefix = 'UNIQUE constraint failed: '
+        message = str(err.orig)
+        if not message.startswith(prefix):
+            return None
+
+        qualified = [
+            name.strip() for name in message[len(prefix) :].split(',')
+        ]
+        table_name = qualified[0].split('.')[0]
+        columns = [name.split('.')[-1] for name in qualified]
+        table = SQLModel.metadata.tables.get(table_name)
+        if table is None:
+            return None
+
+        for index in table.indexes:
+            if index.unique and [c.name for c in index.columns] == columns:
+                return str(index.name)
+
+    return None
 
 
 async def get_session():
-    async with AsyncSession(engine, expire_on_commit=False) as session:
+    async with db.sessions()() as session:
         yield session
+
+
+# GET/HEAD vão para uma réplica, em round-robin; os demais métodos
+# recebem a mesma sessão do primário de get_session, então leituras
+# depois de uma escrita na mesma request enxergam a escrita
+async def get_read_session(
+    request: Request, session: AsyncSession = Depends(get_session)
+):
+    replicas = db.read_session_factories
+    if request.method not in {'GET', 'HEAD'} or not replicas:
+        yield session
+        return
+
+    replica = next(db.replica_counter) % len(replicas)
+    async with replicas[replica]() as read_session:
+        yield read_session
+
+
+# para respostas em streaming: a sessão de get_session já foi fechada
+# quando o corpo começa a ser enviado, então o handler abre a sua
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return db.sessions()
@@ -0,0 +1,156 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from functools import partial
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.metrics import statement_elapsed, time_statements
+from src.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestDiagnostics:
+    """Statements executados durante uma request."""
+
+    __slots__ = ('flagged', 'last_context', 'scope', 'statements', 'templates')
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.statements = 0
+        self.templates: Counter[str] = Counter()
+        # evita avisar mais de uma vez pelo mesmo motivo
+        self.flagged: set[str] = set()
+        self.last_context: DefaultExecutionContext | None = None
+
+    @property
+    def route(self) -> str:
+        path = getattr(self.scope.get('route'), 'path', 'unmatched')
+        return f'{self.scope["method"]} {path}'
+
+
+current_request: ContextVar[RequestDiagnostics | None] = ContextVar(
+    'current_request', default=None
+)
+
+
+class DiagnosticsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        token = current_request.set(RequestDiagnostics(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+
+def parameters_shape(parameters: Any, executemany: bool) -> str:
+    """Tipos dos parâmetros, sem os valores (podem ter dados pessoais)."""
+    if executemany:
+        rows = list(parameters)
+        first = parameters_shape(rows[0], False) if rows else '()'
+        return f'{len(rows)} x {first}'
+    if isinstance(parameters, dict):
+        fields = (f'{k}: {type(v).__name__}' for k, v in parameters.items())
+        return '{' + ', '.join(fields) + '}'
+    types = (type(value).__name__ for value in parameters or ())
+    return '(' + ', '.join(types) + ')'
+
+
+def after_cursor_execute(
+    settings: Settings, context: DefaultExecutionContext, **kw: Any
+) -> None:
+    record_statement(settings, context, kw['statement'], kw['parameters'])
+
+
+def handle_error(
+    settings: Settings, exception_context: ExceptionContext
+) -> None:
+    context = exception_context.execution_context
+    if isinstance(context, DefaultExecutionContext):
+        record_statement(
+            settings,
+            context,
+            exception_context.statement or '',
+            exception_context.parameters,
+            failed=True,
+        )
+
+
+def record_statement(
+    settings: Settings,
+    context: DefaultExecutionContext,
+    statement: str,
+    parameters: Any,
+    *,
+    failed: bool = False,
+) -> None:
+    elapsed = statement_elapsed(context)
+    if elapsed is None:
+        return  # falhou antes de chegar ao cursor
+
+    request = current_request.get()
+    route = request.route if request else None
+
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if threshold and elapsed >= threshold:
+        logger.warning(
+            'slow %squery (%.3fs) on %s: %s parameters=%s',
+            'failed ' if failed else '',
+            elapsed,
+            route or 'no request',
+            statement,
+            parameters_shape(parameters, context.executemany),
+        )
+
+    # um executemany em lotes (insertmanyvalues) dispara um evento por
+    # lote, mas é um único statement do ponto de vista da request
+    if request is None or context is request.last_context:
+        return
+    request.last_context = context
+    request.statements += 1
+    request.templates[statement] += 1
+
+    limit = settings.REQUEST_STATEMENTS_LIMIT
+    if limit and request.statements > limit and 'count' not in request.flagged:
+        request.flagged.add('count')
+        logger.warning(
+            'request %s issued more than %d statements', route, limit
+        )
+
+    repeat_limit = settings.REQUEST_REPEATED_STATEMENTS_LIMIT
+    if (
+        repeat_limit
+        and request.templates[statement] > repeat_limit
+        and statement not in request.flagged
+    ):
+        request.flagged.add(statement)
+        logger.warning(
+            'possible N+1 on %s: statement repeated more than %d times: %s',
+            route,
+            repeat_limit,
+            statement,
+        )
+
+
+def instrument_engine(engine: AsyncEngine, settings: Settings) -> None:
+    time_statements(engine)
+    for name, listener in (
+        ('after_cursor_execute', partial(after_cursor_execute, settings)),
+        ('handle_error', partial(handle_error, settings)),
+    ):
+        event.listen(engine.sync_engine, name, listener, named=True)
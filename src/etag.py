@@ -0,0 +1,31 @@
+import hashlib
+
+from fastapi import Response
+from fastapi import status as http_status
+
+
+def make_etag(*parts: object) -> str:
+    """ETag forte a partir dos valores que definem a representação."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match usa comparação fraca: W/"x" casa com "x"
+    return any(
+        tag.strip().removeprefix('W/') == etag
+        for tag in if_none_match.split(',')
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=http_status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+    )
@@ -0,0 +1,114 @@
+"""Resumo do tempo de import de um módulo (``python -X importtime``).
+
+    python -m src.importtime                   # src.app, 15 maiores
+    python -m src.importtime src.security --top 30 --json
+
+O import roda num processo novo, então o resultado é o de um worker
+subindo do zero.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, NamedTuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    # import time:       417 |     477625 |   fastapi
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:') :].split('|')
+        if not self_us.strip().isdigit():
+            continue  # cabeçalho
+        stripped = name.lstrip()
+        records.append(
+            ImportRecord(
+                name=stripped,
+                depth=(len(name) - len(stripped) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return records
+
+
+def measure_imports(module: str) -> list[ImportRecord]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PROJECT_ROOT,
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize(
+    records: list[ImportRecord], module: str, top: int
+) -> dict[str, Any]:
+    total_us = next(
+        (r.cumulative_us for r in records if r.name == module and not r.depth),
+        sum(r.self_us for r in records),
+    )
+    # tempo próprio somado por pacote raiz (fastapi, sqlalchemy, src...)
+    packages: Counter[str] = Counter()
+    for record in records:
+        packages[record.name.split('.')[0]] += record.self_us
+
+    slowest = sorted(records, key=lambda r: r.self_us, reverse=True)
+    return {
+        'module': module,
+        'total_ms': total_us / 1000,
+        'modules_imported': len(records),
+        'packages_ms': {
+            name: us / 1000 for name, us in packages.most_common(top)
+        },
+        'slowest_modules_ms': {
+            r.name: r.self_us / 1000 for r in slowest[:top]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('module', nargs='?', default='src.app')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    report = summarize(measure_imports(args.module), args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f'{report["module"]}: {report["total_ms"]:.1f} ms, '
+        f'{report["modules_imported"]} modules'
+    )
+    for title, key in (
+        ('by package (self time)', 'packages_ms'),
+        ('slowest modules (self time)', 'slowest_modules_ms'),
+    ):
+        print(f'\n{title}:')
+        for name, ms in report[key].items():
+            print(f'  {ms:9.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
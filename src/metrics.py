@@ -0,0 +1,234 @@
+import time
+from bisect import bisect_left
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# limites (em segundos) dos buckets; fixos para não alocar por request
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STATEMENT_KINDS = ('select', 'insert', 'update', 'delete', 'ddl')
+
+
+class Histogram:
+    __slots__ = ('bounds', 'count', 'counts', 'sum')
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        # um contador por bucket, mais o +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.extend((
+            f'{name}_bucket{{{labels},le="+Inf"}} {self.count}',
+            f'{name}_sum{{{labels}}} {self.sum}',
+            f'{name}_count{{{labels}}} {self.count}',
+        ))
+        return lines
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'method', 'path', 'statuses')
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.latency = Histogram()
+        self.statuses: dict[int, int] = {}
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        # chave é o id da operação da rota, não o path da URL:
+        # cardinalidade fixa
+        self.routes: dict[str, RouteMetrics] = {}
+        self.statements = {kind: Histogram() for kind in STATEMENT_KINDS}
+
+    def observe_request(
+        self, route: Any, method: str, status_code: int, elapsed: float
+    ) -> None:
+        key = getattr(route, 'unique_id', 'unmatched')
+        route_metrics = self.routes.get(key)
+        if route_metrics is None:
+            if route is None:
+                method = 'ANY'
+            path = getattr(route, 'path', 'unmatched')
+            route_metrics = self.routes[key] = RouteMetrics(method, path)
+
+        route_metrics.latency.observe(elapsed)
+        statuses = route_metrics.statuses
+        statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    def observe_statement(self, kind: str, elapsed: float) -> None:
+        self.statements[kind].observe(elapsed)
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.statements = {kind: Histogram() for kind in STATEMENT_KINDS}
+
+    def render(self, gauges: dict[str, float] | None = None) -> str:
+        lines = ['# TYPE http_requests_total counter']
+        for route in self.routes.values():
+            labels = f'method="{route.method}",route="{route.path}"'
+            lines.extend(
+                f'http_requests_total{{{labels},status="{status}"}} {count}'
+                for status, count in sorted(route.statuses.items())
+            )
+
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for route in self.routes.values():
+            labels = f'method="{route.method}",route="{route.path}"'
+            lines.extend(
+                route.latency.render('http_request_duration_seconds', labels)
+            )
+
+        lines.append('# TYPE db_statement_duration_seconds histogram')
+        for kind, histogram in self.statements.items():
+            lines.extend(
+                histogram.render(
+                    'db_statement_duration_seconds', f'operation="{kind}"'
+                )
+            )
+
+        for name, value in (gauges or {}).items():
+            lines.extend((f'# TYPE {name} gauge', f'{name} {value}'))
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    def __init__(
+        self, app: ASGIApp, registry: MetricsRegistry = metrics
+    ) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # sem resposta (exceção não tratada) conta como 500
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # o router do FastAPI preenche scope['route'] ao casar a rota
+            self.registry.observe_request(
+                scope.get('route'),
+                scope['method'],
+                status_code,
+                time.perf_counter() - start,
+            )
+
+
+def statement_kind(context: DefaultExecutionContext) -> str:
+    if context.isinsert:
+        return 'insert'
+    if context.isupdate:
+        return 'update'
+    if context.isdelete:
+        return 'delete'
+    if context.isddl:
+        return 'ddl'
+    return 'select'
+
+
+# o início fica no contexto da execução, que morre com ela: um statement
+# que falha não deixa nada para trás na conexão do pool
+START_ATTRIBUTE = '_statement_start'
+
+
+def before_cursor_execute(context: DefaultExecutionContext, **_: Any) -> None:
+    setattr(context, START_ATTRIBUTE, time.perf_counter())
+
+
+def statement_elapsed(context: Any) -> float | None:
+    """Segundos desde o início do statement; None se não chegou ao cursor."""
+    start: float | None = getattr(context, START_ATTRIBUTE, None)
+    return None if start is None else time.perf_counter() - start
+
+
+def time_statements(engine: AsyncEngine) -> None:
+    """Marca o início de cada statement, uma vez só por engine.
+
+    Métricas e diagnóstico leem o mesmo início com ``statement_elapsed``.
+    """
+    if not event.contains(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    ):
+        event.listen(
+            engine.sync_engine,
+            'before_cursor_execute',
+            before_cursor_execute,
+            named=True,
+        )
+
+
+def observe_statement(context: DefaultExecutionContext) -> None:
+    elapsed = statement_elapsed(context)
+    if elapsed is not None:
+        metrics.observe_statement(statement_kind(context), elapsed)
+
+
+def after_cursor_execute(context: DefaultExecutionContext, **_: Any) -> None:
+    observe_statement(context)
+
+
+def handle_error(exception_context: ExceptionContext) -> None:
+    # statements que falham (409 de UNIQUE, por exemplo) também contam
+    context = exception_context.execution_context
+    if isinstance(context, DefaultExecutionContext):
+        observe_statement(context)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    time_statements(engine)
+    for name, listener in (
+        ('after_cursor_execute', after_cursor_execute),
+        ('handle_error', handle_error),
+    ):
+        event.listen(engine.sync_engine, name, listener, named=True)
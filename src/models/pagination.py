@@ -1,6 +1,42 @@
+import base64
+import json
+from typing import Any
+
 from sqlmodel import SQLModel
 
+# ids são inteiros de 64 bits com sinal; fora disso o driver estoura
+MIN_CURSOR_ID = -(2**63)
+MAX_CURSOR_ID = 2**63 - 1
+
 
 class FilterPage(SQLModel):
     offset: int = 0
     limit: int = 100
+    # quando informado, pagina por chave (keyset) e ignora o offset
+    cursor: str | None = None
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as err:
+        raise ValueError('invalid cursor') from err
+
+    if not isinstance(values, list):
+        raise ValueError('invalid cursor')
+
+    return values
+
+
+def cursor_id(value: Any) -> int:
+    """Id vindo de um cursor: só int de verdade (bool não) e em 64 bits."""
+    if type(value) is not int or not (MIN_CURSOR_ID <= value <= MAX_CURSOR_ID):
+        raise ValueError('invalid cursor')
+
+    return value
@@ -0,0 +1,86 @@
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, Index, func, text
+from sqlmodel import Field, SQLModel
+
+
+class TaskStatus(str, Enum):
+    todo = 'todo'
+    doing = 'doing'
+    done = 'done'
+
+
+# mesmo predicado do índice parcial, como literal: com um parâmetro o
+# planner não consegue provar que a consulta cabe no índice
+OPEN_TASKS_PREDICATE = "status != 'done'"
+
+
+class TaskInput(SQLModel):
+    title: str = Field(max_length=200)
+    status: TaskStatus = TaskStatus.todo
+    due_date: datetime
+
+
+class TaskResponse(SQLModel):
+    id: int
+    title: str
+    status: TaskStatus
+    due_date: datetime
+    created_at: datetime
+    updated_at: datetime
+
+
+class ListTaskResponse(SQLModel):
+    tasks: list[TaskResponse]
+    next_cursor: str | None = None
+
+
+class TaskFilterPage(SQLModel):
+    limit: int = 100
+    cursor: str | None = None
+    # sem status, lista as tarefas em aberto (tudo que não está done)
+    status: TaskStatus | None = None
+
+
+# DB Class
+class Task(SQLModel, table=True):
+    __tablename__ = 'tasks'
+    __table_args__ = (
+        # "tarefas de um status do usuário, por vencimento"
+        Index(
+            'ix_tasks_owner_id_status_due_date',
+            'owner_id',
+            'status',
+            'due_date',
+            'id',
+        ),
+        # "tarefas em aberto do usuário, por vencimento"
+        Index(
+            'ix_tasks_owner_id_open_due_date',
+            'owner_id',
+            'due_date',
+            'id',
+            sqlite_where=text(OPEN_TASKS_PREDICATE),
+            postgresql_where=text(OPEN_TASKS_PREDICATE),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    owner_id: int = Field(
+        foreign_key='users.id', ondelete='CASCADE', nullable=False
+    )
+    title: str = Field(max_length=200, nullable=False)
+    status: TaskStatus = Field(default=TaskStatus.todo, nullable=False)
+    due_date: datetime = Field(nullable=False)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime, server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(
+            DateTime,
+            server_default=func.now(),
+            onupdate=func.now(),
+            nullable=False,
+        )
+    )
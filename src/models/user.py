@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import UTC, datetime
+from typing import Literal
 
 from pydantic import EmailStr
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, Index, func
 from sqlmodel import Field, SQLModel
 
 
@@ -11,6 +12,12 @@ class UserInput(SQLModel):
     password: str
 
 
+class UserPatch(SQLModel):
+    username: str | None = None
+    email: EmailStr | None = None
+    password: str | None = None
+
+
 class UserResponse(SQLModel):
     id: int
     username: str
@@ -21,15 +28,46 @@ class UserResponse(SQLModel):
 
 class ListUserResponse(SQLModel):
     users: list[UserResponse]
+    next_cursor: str | None = None
+
+
+class BulkUserResult(SQLModel):
+    index: int
+    status: Literal['created', 'conflict']
+    user: UserResponse | None = None
+    detail: str | None = None
+
+
+class BulkUserResponse(SQLModel):
+    results: list[BulkUserResult]
+
+
+class BatchUserResponse(SQLModel):
+    # chaves são os ids pedidos, em texto (objetos JSON só têm chave string)
+    users: dict[str, UserResponse]
+    missing: list[int]
 
 
 class Message(SQLModel):
     message: str
 
 
+def utcnow() -> datetime:
+    # UTC sem fuso, com microssegundos: updated_at é a base da ETag, e com
+    # resolução de segundo duas escritas no mesmo segundo teriam a mesma
+    # ETag. created_at e updated_at saem os dois deste relógio; o now() do
+    # banco fica só para linhas gravadas fora da aplicação (no PostgreSQL
+    # ele segue o TimeZone da sessão)
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
 # DB Class
 class User(SQLModel, table=True):
     __tablename__ = 'users'
+    __table_args__ = (
+        # validação de ETag lê só (id, updated_at), sem carregar a linha
+        Index('ix_users_id_updated_at', 'id', 'updated_at'),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     username: str = Field(
@@ -38,13 +76,19 @@ class User(SQLModel, table=True):
     email: EmailStr = Field(index=True, nullable=False, unique=True)
     password: str = Field(nullable=False, max_length=128)
     created_at: datetime = Field(
-        sa_column=Column(DateTime, server_default=func.now(), nullable=False)
+        sa_column=Column(
+            DateTime,
+            default=utcnow,
+            server_default=func.now(),
+            nullable=False,
+        )
     )
     updated_at: datetime = Field(
         sa_column=Column(
             DateTime,
+            default=utcnow,
             server_default=func.now(),
-            onupdate=func.now(),
+            onupdate=utcnow,
             nullable=False,
         )
     )
@@ -0,0 +1,142 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from ipaddress import ip_address, ip_network
+from typing import Protocol
+
+from fastapi import HTTPException, Request
+from fastapi import status as http_status
+
+from src.settings import get_settings
+
+settings = get_settings()
+
+
+class RateLimitBackend(Protocol):
+    """Armazena os buckets; trocável por um store compartilhado."""
+
+    async def consume(
+        self, key: str, capacity: int, refill_rate: float
+    ) -> float:
+        """Gasta um token; devolve 0 ou os segundos até haver um."""
+        ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryTokenBucketBackend:
+    """Token buckets em memória, limitados aos ``maxsize`` mais recentes."""
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        # chave -> (tokens, instante da última recarga)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(
+        self, key: str, capacity: int, refill_rate: float
+    ) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        # a chave ociosa há mais tempo sai primeiro; um bucket descartado
+        # volta cheio, o que só favorece quem ficou parado
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+    async def clear(self) -> None:
+        self._buckets.clear()
+
+
+class TrustedProxies:
+    """Proxies cujo X-Forwarded-For é aceito (IPs ou redes)."""
+
+    def __init__(self, proxies: Iterable[str]) -> None:
+        self.networks = [ip_network(proxy, strict=False) for proxy in proxies]
+
+    def is_trusted(self, address: str) -> bool:
+        try:
+            ip = ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.networks)
+
+    def client_ip(self, request: Request) -> str:
+        """IP do cliente, atravessando só os proxies confiáveis.
+
+        O X-Forwarded-For é lido da direita para a esquerda: o primeiro
+        endereço que não é de um proxy confiável é o do cliente. Os que
+        estão à esquerda dele o próprio cliente pode ter forjado.
+        """
+        if request.client is None:
+            return 'unknown'
+
+        hops = [
+            hop.strip()
+            for header in request.headers.getlist('x-forwarded-for')
+            for hop in header.split(',')
+            if hop.strip()
+        ]
+        address = request.client.host
+        while hops and self.is_trusted(address):
+            address = hops.pop()
+        return address
+
+
+class LoginRateLimiter:
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        *,
+        ip_capacity: int,
+        ip_refill_rate: float,
+        email_capacity: int,
+        email_refill_rate: float,
+    ) -> None:
+        self.backend = backend
+        # capacidade 0 desliga o limite correspondente
+        self.limits = (
+            ('ip', ip_capacity, ip_refill_rate),
+            ('email', email_capacity, email_refill_rate),
+        )
+
+    async def check(self, ip: str, email: str) -> None:
+        """Levanta 429 se o IP ou o e-mail passou do limite."""
+        values = {'ip': ip, 'email': email.lower()}
+        for name, capacity, refill_rate in self.limits:
+            if capacity <= 0:
+                continue
+
+            retry_after = await self.backend.consume(
+                f'{name}:{values[name]}', capacity, refill_rate
+            )
+            if retry_after:
+                raise HTTPException(
+                    status_code=http_status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail='Too many login attempts',
+                    headers={'Retry-After': str(math.ceil(retry_after))},
+                )
+
+
+login_rate_limiter = LoginRateLimiter(
+    MemoryTokenBucketBackend(maxsize=settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+    ip_capacity=settings.LOGIN_RATE_LIMIT_IP_CAPACITY,
+    ip_refill_rate=settings.LOGIN_RATE_LIMIT_IP_REFILL_RATE,
+    email_capacity=settings.LOGIN_RATE_LIMIT_EMAIL_CAPACITY,
+    email_refill_rate=settings.LOGIN_RATE_LIMIT_EMAIL_REFILL_RATE,
+)
+trusted_proxies = TrustedProxies(settings.LOGIN_RATE_LIMIT_TRUSTED_PROXIES)
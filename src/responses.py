@@ -0,0 +1,8 @@
+from typing import Any
+
+import orjson
+
+
+def dump_json(content: Any) -> bytes:
+    # orjson já serializa datetime no mesmo formato ISO que o pydantic
+    return orjson.dumps(content)
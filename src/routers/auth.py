@@ -1,7 +1,7 @@
 # mypy: disable-error-code="no-untyped-def"
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi import status as http_status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,10 +10,13 @@ from sqlmodel import select
 from src.database import get_session
 from src.models import auth as auth_model
 from src.models import user as user_models
+from src.ratelimit import login_rate_limiter, trusted_proxies
+from src.routers import users
 from src.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    invalidate_principal,
+    verify_and_update_password_async,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
@@ -25,9 +28,15 @@ CurrentUser = Annotated[user_models.User, Depends(get_current_user)]
 
 @router.post('/token', response_model=auth_model.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2FormDep,
     session: SessionDep,
 ):
+    # antes de qualquer consulta ou hash: é o que o limite protege
+    await login_rate_limiter.check(
+        trusted_proxies.client_ip(request), form_data.username
+    )
+
     user = await session.scalar(
         select(user_models.User).where(
             user_models.User.email == form_data.username
@@ -40,12 +49,24 @@ async def login_for_access_token(
             detail='Incorrect email or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    verified, updated_hash = await verify_and_update_password_async(
+        form_data.password, user.password
+    )
+    if not verified:
         raise HTTPException(
             status_code=http_status.HTTP_401_UNAUTHORIZED,
             detail='Incorrect email or password',
         )
 
+    # hash gerado com parâmetros antigos do argon2: aproveita a senha em
+    # texto puro, que só temos aqui, para regravá-lo com os atuais
+    if updated_hash is not None:
+        user.password = updated_hash
+        await session.commit()
+        invalidate_principal(user.email)
+        # o updated_at mudou, e ele aparece na listagem
+        await users.list_cache.bump_generation()
+
     access_token = create_access_token(data={'sub': user.email})
 
     return {'access_token': access_token, 'token_type': 'bearer'}
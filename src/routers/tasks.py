@@ -0,0 +1,154 @@
+# mypy: disable-error-code="no-untyped-def"
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import status as http_status
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from src.database import get_session
+from src.models import task as task_models
+from src.models import user as user_models
+from src.models.pagination import cursor_id, decode_cursor, encode_cursor
+from src.security import get_current_user
+
+router = APIRouter(prefix='/tasks', tags=['tasks'])
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+CurrentUserDep = Annotated[user_models.User, Depends(get_current_user)]
+
+
+def decode_task_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        due_date, task_id = decode_cursor(cursor)
+        return datetime.fromisoformat(due_date), cursor_id(task_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor',
+        )
+
+
+def tasks_list_query(
+    owner_id: int | None, filter_tasks: task_models.TaskFilterPage
+) -> Select[Any]:
+    # os filtros seguem a ordem das colunas dos índices compostos:
+    # owner_id, (status), due_date, id
+    query = select(task_models.Task).where(
+        task_models.Task.owner_id == owner_id
+    )
+
+    if filter_tasks.status is None:
+        query = query.where(text(task_models.OPEN_TASKS_PREDICATE))
+    else:
+        query = query.where(task_models.Task.status == filter_tasks.status)
+
+    if filter_tasks.cursor:
+        due_date, task_id = decode_task_cursor(filter_tasks.cursor)
+        query = query.where(
+            tuple_(col(task_models.Task.due_date), col(task_models.Task.id))
+            > (due_date, task_id)
+        )
+
+    return query.order_by(
+        col(task_models.Task.due_date), col(task_models.Task.id)
+    ).limit(filter_tasks.limit + 1)
+
+
+async def get_owned_task(
+    task_id: int, session: AsyncSession, current_user: user_models.User
+) -> task_models.Task:
+    db_task = await session.scalar(
+        select(task_models.Task).where(
+            task_models.Task.id == task_id,
+            task_models.Task.owner_id == current_user.id,
+        )
+    )
+    if not db_task:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND, detail='Task not found'
+        )
+
+    return db_task
+
+
+@router.post(
+    '/',
+    status_code=http_status.HTTP_201_CREATED,
+    response_model=task_models.TaskResponse,
+)
+async def create_task(
+    task: task_models.TaskInput,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+):
+    db_task = task_models.Task(**task.model_dump(), owner_id=current_user.id)
+    session.add(db_task)
+    await session.commit()
+    await session.refresh(db_task)
+
+    return db_task
+
+
+@router.get(
+    '/',
+    response_model=task_models.ListTaskResponse,
+    response_model_exclude_none=True,
+)
+async def get_tasks_list(
+    session: SessionDep,
+    current_user: CurrentUserDep,
+    filter_tasks: Annotated[task_models.TaskFilterPage, Query()],
+):
+    rows = (
+        await session.scalars(tasks_list_query(current_user.id, filter_tasks))
+    ).all()
+    tasks = rows[: filter_tasks.limit]
+
+    next_cursor = None
+    if tasks and len(rows) > len(tasks):
+        next_cursor = encode_cursor(
+            tasks[-1].due_date.isoformat(), tasks[-1].id
+        )
+
+    return {'tasks': tasks, 'next_cursor': next_cursor}
+
+
+@router.get('/{task_id}', response_model=task_models.TaskResponse)
+async def get_one_task(
+    task_id: int, session: SessionDep, current_user: CurrentUserDep
+):
+    return await get_owned_task(task_id, session, current_user)
+
+
+@router.put('/{task_id}', response_model=task_models.TaskResponse)
+async def update_task(
+    task_id: int,
+    task: task_models.TaskInput,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+):
+    db_task = await get_owned_task(task_id, session, current_user)
+
+    for key, value in task.model_dump().items():
+        setattr(db_task, key, value)
+
+    session.add(db_task)
+    await session.commit()
+    await session.refresh(db_task)
+
+    return db_task
+
+
+@router.delete('/{task_id}', response_model=user_models.Message)
+async def delete_task(
+    task_id: int, session: SessionDep, current_user: CurrentUserDep
+):
+    db_task = await get_owned_task(task_id, session, current_user)
+
+    await session.delete(db_task)
+    await session.commit()
+
+    return {'message': 'Task deleted'}
@@ -1,25 +1,93 @@
 # mypy: disable-error-code="no-untyped-def"
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from typing import Annotated, Any, Literal, NoReturn
 
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+)
 from fastapi import status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import col, or_, select
 
-from src.database import get_session
+from src.cache import MemoryResponseCache, ResponseCacheBackend
+from src.database import (
+    get_read_session,
+    get_session,
+    get_session_factory,
+    violated_constraint,
+)
+from src.etag import etag_matches, make_etag, not_modified
 from src.models import user as user_models
-from src.models.pagination import FilterPage
+from src.models.pagination import (
+    FilterPage,
+    cursor_id,
+    decode_cursor,
+    encode_cursor,
+)
+from src.responses import dump_json
 from src.security import (
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
+    get_password_hashes_async,
+    invalidate_principal,
 )
+from src.settings import get_settings
+from src.singleflight import SingleFlight
 
+settings = get_settings()
+# páginas de GET /users/ já codificadas, cada uma precedida da sua ETag
+list_cache: ResponseCacheBackend = MemoryResponseCache(
+    maxsize=settings.USERS_LIST_CACHE_SIZE,
+    max_bytes=settings.USERS_LIST_CACHE_MAX_BYTES,
+    ttl=settings.USERS_LIST_CACHE_TTL,
+)
+# chave: (id, campos pedidos em fields=)
+user_lookups: SingleFlight[
+    tuple[int, tuple[str, ...]], dict[str, Any] | None
+] = SingleFlight()
+user_version_lookups: SingleFlight[int, datetime | None] = SingleFlight()
 router = APIRouter(prefix='/users', tags=['users'])
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+SessionFactoryDep = Annotated[
+    async_sessionmaker[AsyncSession], Depends(get_session_factory)
+]
 CurrentUserDep = Annotated[user_models.User, Depends(get_current_user)]
+IfNoneMatchHeader = Annotated[str | None, Header()]
+
+# índices únicos de users -> mensagem do 409
+UNIQUE_CONFLICTS = {
+    'ix_users_username': 'username already exists',
+    'ix_users_email': 'email already exists',
+}
+
+
+async def raise_conflict(
+    session: AsyncSession, err: IntegrityError
+) -> NoReturn:
+    await session.rollback()
+
+    constraint = violated_constraint(err, session.get_bind().dialect.name)
+    if constraint not in UNIQUE_CONFLICTS:
+        raise err
+
+    raise HTTPException(
+        status_code=http_status.HTTP_409_CONFLICT,
+        detail=UNIQUE_CONFLICTS[constraint],
+    )
 
 
 @router.post(
@@ -28,37 +96,233 @@ CurrentUserDep = Annotated[user_models.User, Depends(get_current_user)]
     response_model=user_models.UserResponse,
 )
 async def create_user(user: user_models.UserInput, session: SessionDep):
-    db_user = await session.scalar(
-        select(user_models.User).where(
+    hashed_password = await get_password_hash_async(user.password)
+    user_dict = user.model_dump()
+    user_dict['password'] = hashed_password
+
+    # os índices únicos detectam username/email repetidos no próprio INSERT
+    try:
+        db_user = await session.scalar(
+            insert(user_models.User)
+            .values(**user_dict)
+            .returning(user_models.User)
+        )
+        await session.commit()
+    except IntegrityError as err:
+        await raise_conflict(session, err)
+    await list_cache.bump_generation()
+
+    return db_user
+
+
+@router.post('/bulk', response_model=user_models.BulkUserResponse)
+async def create_users_bulk(
+    users: list[user_models.UserInput], session: SessionDep
+):
+    if len(users) > settings.USERS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=http_status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.USERS_BULK_MAX_ITEMS} users per call',
+        )
+
+    # uma única consulta para todos os conflitos já existentes no banco
+    existing = await session.execute(
+        select(user_models.User.username, user_models.User.email).where(
             or_(
-                user_models.User.username == user.username,
-                user_models.User.email == user.email,
+                col(user_models.User.username).in_({
+                    user.username for user in users
+                }),
+                col(user_models.User.email).in_({
+                    user.email for user in users
+                }),
             )
         )
     )
+    taken_usernames, taken_emails = set(), set()
+    for username, email in existing:
+        taken_usernames.add(username)
+        taken_emails.add(email)
 
-    if db_user:
-        if db_user.username == user.username:
-            raise HTTPException(
-                status_code=http_status.HTTP_409_CONFLICT,
-                detail='username already exists',
-            )
+    results: list[dict[str, Any]] = []
+    pending: list[tuple[int, user_models.UserInput]] = []
+    for index, user in enumerate(users):
+        # repetidos dentro do próprio lote também são conflito
+        if user.username in taken_usernames:
+            detail = 'username already exists'
+        elif user.email in taken_emails:
+            detail = 'email already exists'
         else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            pending.append((index, user))
+            continue
+
+        results.append({
+            'index': index,
+            'status': 'conflict',
+            'detail': detail,
+        })
+
+    if pending:
+        hashed_passwords = await get_password_hashes_async([
+            user.password for _, user in pending
+        ])
+        rows = [
+            {**user.model_dump(), 'password': hashed_password}
+            for (_, user), hashed_password in zip(pending, hashed_passwords)
+        ]
+
+        try:
+            created = await session.scalars(
+                insert(user_models.User).returning(
+                    user_models.User, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            db_users = created.all()
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
             raise HTTPException(
                 status_code=http_status.HTTP_409_CONFLICT,
-                detail='email already exists',
+                detail='users were created concurrently, retry the request',
             )
+        await list_cache.bump_generation()
 
-    hashed_password = get_password_hash(user.password)
-    user_dict = user.model_dump()
-    user_dict['password'] = hashed_password
+        results.extend(
+            {'index': index, 'status': 'created', 'user': db_user}
+            for (index, _), db_user in zip(pending, db_users)
+        )
 
-    db_user = user_models.User(**user_dict)
-    session.add(db_user)
-    await session.commit()
-    await session.refresh(db_user)
+    results.sort(key=lambda result: result['index'])
 
-    return db_user
+    return {'results': results}
+
+
+# colunas de UserResponse, lidas como tuplas e não como objetos do ORM
+RESPONSE_COLUMNS = tuple(user_models.UserResponse.model_fields)
+
+
+def response_columns(columns: Iterable[str] = RESPONSE_COLUMNS) -> list[Any]:
+    return [getattr(user_models.User, column) for column in columns]
+
+
+async def parse_fields(
+    fields: Annotated[str | None, Query()] = None,
+) -> tuple[str, ...]:
+    """Campos pedidos em ``fields=id,username``, na ordem de UserResponse."""
+    # async para não ir ao threadpool, como toda dependência síncrona
+    if fields is None:
+        return RESPONSE_COLUMNS
+
+    requested = {field.strip() for field in fields.split(',')} - {''}
+    if not requested:
+        raise HTTPException(
+            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='No fields requested',
+        )
+
+    unknown = requested.difference(RESPONSE_COLUMNS)
+    if unknown:
+        raise HTTPException(
+            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'Unknown fields: {", ".join(sorted(unknown))}',
+        )
+
+    return tuple(column for column in RESPONSE_COLUMNS if column in requested)
+
+
+def projection(fields: tuple[str, ...]) -> list[Any]:
+    # id e updated_at sempre vêm (cursor e ETag), mas depois dos campos
+    # pedidos: dict(zip(fields, row)) deixa os extras de fora
+    return response_columns(dict.fromkeys((*fields, 'id', 'updated_at')))
+
+
+FieldsDep = Annotated[tuple[str, ...], Depends(parse_fields)]
+
+
+def encode_ndjson(rows: Sequence[Sequence[Any]]) -> str:
+    return ''.join(
+        json.dumps(
+            dict(zip(RESPONSE_COLUMNS, row)), default=datetime.isoformat
+        )
+        + '\n'
+        for row in rows
+    )
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_users_export(
+    session_factory: async_sessionmaker[AsyncSession],
+    export_format: Literal['ndjson', 'csv'],
+) -> AsyncIterator[str]:
+    encode = encode_csv if export_format == 'csv' else encode_ndjson
+    if export_format == 'csv':
+        yield encode_csv([RESPONSE_COLUMNS])
+
+    async with session_factory() as session:
+        result = await session.stream(
+            select(*response_columns())
+            .order_by(col(user_models.User.id))
+            .execution_options(yield_per=settings.USERS_EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield encode(rows)
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_users(
+    session_factory: SessionFactoryDep,
+    export_format: Annotated[
+        Literal['ndjson', 'csv'], Query(alias='format')
+    ] = 'ndjson',
+):
+    media_type = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+    filename = f'users.{export_format}'
+
+    return StreamingResponse(
+        stream_users_export(session_factory, export_format),
+        media_type=media_type[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    )
+
+
+# declarada antes de /{user_id}, que também casaria com /batch
+@router.get('/batch', response_model=user_models.BatchUserResponse)
+async def get_users_batch(
+    session: ReadSessionDep,
+    ids: Annotated[list[int], Query(min_length=1)],
+):
+    # dict.fromkeys: tira repetidos mantendo a ordem pedida
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > settings.USERS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'At most {settings.USERS_BATCH_MAX_IDS} ids per call',
+        )
+
+    # uma consulta só, pela chave primária
+    rows = await session.execute(
+        select(*response_columns()).where(
+            col(user_models.User.id).in_(unique_ids)
+        )
+    )
+    found = {row.id: dict(zip(RESPONSE_COLUMNS, row)) for row in rows}
+
+    content = {
+        'users': {
+            str(user_id): found[user_id]
+            for user_id in unique_ids
+            if user_id in found
+        },
+        'missing': [user_id for user_id in unique_ids if user_id not in found],
+    }
+    return Response(dump_json(content), media_type='application/json')
 
 
 @router.get(
@@ -66,30 +330,160 @@ async def create_user(user: user_models.UserInput, session: SessionDep):
     status_code=http_status.HTTP_200_OK,
     response_model=user_models.UserResponse,
 )
-async def get_one_user(user_id: int, session: SessionDep):
-    db_user = await session.scalar(
-        select(user_models.User).where(user_models.User.id == user_id)
-    )
-    if not db_user:
+async def get_one_user(
+    user_id: int,
+    session: ReadSessionDep,
+    fields: FieldsDep,
+    if_none_match: IfNoneMatchHeader = None,
+):
+    # requisição condicional: valida só com (id, updated_at), sem
+    # carregar nem serializar a linha
+    if if_none_match:
+
+        async def lookup_version() -> datetime | None:
+            updated_at: datetime | None = await session.scalar(
+                select(user_models.User.updated_at).where(
+                    user_models.User.id == user_id
+                )
+            )
+            return updated_at
+
+        updated_at = await user_version_lookups.do(user_id, lookup_version)
+        if updated_at is not None:
+            etag = make_etag(user_id, updated_at, fields)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    async def lookup() -> dict[str, Any] | None:
+        row = (
+            await session.execute(
+                select(*projection(fields)).where(
+                    user_models.User.id == user_id
+                )
+            )
+        ).first()
+        return None if row is None else row._asdict()
+
+    # requests simultâneos pelo mesmo id (e mesmos campos) dividem a
+    # consulta e recebem os valores das colunas, não uma instância presa
+    # à sessão de outro request
+    user_data = await user_lookups.do((user_id, fields), lookup)
+    if user_data is None:
         raise HTTPException(
             status_code=http_status.HTTP_404_NOT_FOUND, detail='User not found'
         )
 
-    return db_user
+    content = {field: user_data[field] for field in fields}
+    return Response(
+        dump_json(content),
+        media_type='application/json',
+        headers={'ETag': make_etag(user_id, user_data['updated_at'], fields)},
+    )
+
 
+async def render_users_page(
+    session: AsyncSession, filter_users: FilterPage, fields: tuple[str, ...]
+) -> tuple[str, bytes]:
+    """ETag e corpo JSON de uma página de GET /users/."""
+    # busca um registro a mais para saber se existe próxima página
+    query = (
+        select(*projection(fields))
+        .order_by(col(user_models.User.id))
+        .limit(filter_users.limit + 1)
+    )
+
+    if filter_users.cursor:
+        try:
+            (value,) = decode_cursor(filter_users.cursor)
+            last_id = cursor_id(value)
+        except ValueError:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail='Invalid cursor',
+            )
+
+        query = query.where(col(user_models.User.id) > last_id)
+    else:
+        query = query.offset(filter_users.offset)
+
+    rows = (await session.execute(query)).all()
+    users = rows[: filter_users.limit]
+
+    next_cursor = None
+    if users and len(rows) > len(users):
+        next_cursor = encode_cursor(users[-1].id)
+
+    # hash da página: muda se algum usuário dela mudou, entrou ou saiu
+    etag = make_etag(
+        *((user.id, user.updated_at) for user in users), next_cursor, fields
+    )
 
-@router.get('/', response_model=user_models.ListUserResponse)
+    # linhas já no formato de ListUserResponse: serializa direto, sem
+    # validar de novo pelo response_model (que segue valendo no OpenAPI)
+    content: dict[str, Any] = {
+        'users': [dict(zip(fields, user)) for user in users]
+    }
+    if next_cursor is not None:
+        content['next_cursor'] = next_cursor
+
+    return etag, dump_json(content)
+
+
+@router.get(
+    '/',
+    response_model=user_models.ListUserResponse,
+    response_model_exclude_none=True,
+)
 async def get_users_list(
-    session: SessionDep, filter_users: Annotated[FilterPage, Query()]
+    session: ReadSessionDep,
+    filter_users: Annotated[FilterPage, Query()],
+    fields: FieldsDep,
+    if_none_match: IfNoneMatchHeader = None,
 ):
-    query = await session.scalars(
-        select(user_models.User)
-        .offset(filter_users.offset)
-        .limit(filter_users.limit)
+    # a geração é lida antes da consulta: uma escrita no meio do caminho
+    # deixa esta página numa chave que ninguém mais lê
+    generation = await list_cache.generation()
+    key = (
+        f'users:{generation}:{filter_users.offset}:{filter_users.limit}:'
+        f'{filter_users.cursor}:{",".join(fields)}'
+    )
+
+    cached = await list_cache.get(key)
+    if cached is None:
+        etag, body = await render_users_page(session, filter_users, fields)
+        await list_cache.set(key, etag.encode() + b'\n' + body)
+    else:
+        raw_etag, body = cached.split(b'\n', 1)
+        etag = raw_etag.decode()
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return Response(
+        body, media_type='application/json', headers={'ETag': etag}
     )
-    users = query.all()
 
-    return {'users': users}
+
+async def update_user_columns(
+    session: AsyncSession, user_id: int, user_dict: dict[str, Any]
+) -> user_models.User | None:
+    # UPDATE só das colunas recebidas, devolvendo a linha no mesmo comando
+    try:
+        db_user = await session.scalar(
+            update(user_models.User)
+            .where(col(user_models.User.id) == user_id)
+            .values(**user_dict)
+            .returning(user_models.User)
+            .execution_options(populate_existing=True)
+        )
+        await session.commit()
+    except IntegrityError as err:
+        await raise_conflict(session, err)
+    await list_cache.bump_generation()
+    user_lookups.forget_where(lambda key: key[0] == user_id)
+    user_version_lookups.forget(user_id)
+
+    return db_user
 
 
 @router.put('/{user_id}', response_model=user_models.UserResponse)
@@ -105,29 +499,44 @@ async def update_user(
             detail='Not enough permissions',
         )
 
-    for key, value in user.model_dump().items():
-        setattr(current_user, key, value)
+    subject = current_user.email
+    user_dict = user.model_dump()
+    user_dict['password'] = await get_password_hash_async(user.password)
+
+    db_user = await update_user_columns(session, user_id, user_dict)
+    invalidate_principal(subject)
 
-    current_user.password = get_password_hash(user.password)
+    return db_user
 
-    try:
-        session.add(current_user)
-        await session.commit()
-        await session.refresh(current_user)
 
+@router.patch('/{user_id}', response_model=user_models.UserResponse)
+async def patch_user(
+    user_id: int,
+    user: user_models.UserPatch,
+    session: SessionDep,
+    current_user: CurrentUserDep,
+):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            detail='Not enough permissions',
+        )
+
+    user_dict = user.model_dump(exclude_unset=True, exclude_none=True)
+    if not user_dict:
         return current_user
-    except IntegrityError as err:
-        await session.rollback()
-        if 'username' in err._message():
-            raise HTTPException(
-                status_code=http_status.HTTP_409_CONFLICT,
-                detail='username already exists',
-            )
-        else:
-            raise HTTPException(
-                status_code=http_status.HTTP_409_CONFLICT,
-                detail='email already exists',
-            )
+
+    # o argon2 só roda quando a senha realmente muda
+    if 'password' in user_dict:
+        user_dict['password'] = await get_password_hash_async(
+            user_dict['password']
+        )
+
+    subject = current_user.email
+    db_user = await update_user_columns(session, user_id, user_dict)
+    invalidate_principal(subject)
+
+    return db_user
 
 
 @router.delete('/{user_id}', response_model=user_models.Message)
@@ -144,5 +553,9 @@ async def delete_user(
 
     await session.delete(current_user)
     await session.commit()
+    invalidate_principal(current_user.email)
+    await list_cache.bump_generation()
+    user_lookups.forget_where(lambda key: key[0] == user_id)
+    user_version_lookups.forget(user_id)
 
     return {'message': 'User deleted'}
@@ -1,4 +1,15 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from datetime import datetime, timedelta
+from functools import cache
+from threading import BoundedSemaphore
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
@@ -7,15 +18,29 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
 from jwt.exceptions import DecodeError, ExpiredSignatureError
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import select
 
-from src.database import get_session
+from src.cache import TTLCache
+from src.database import get_read_session
 from src.models.user import User
-from src.settings import Settings
+from src.settings import get_settings
+from src.singleflight import SingleFlight
 
-settings = Settings()
-pwd_context = PasswordHash.recommended()
+settings = get_settings()
+# guarda só os valores das colunas: cada request recebe a sua instância
+principal_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+# misses simultâneos do mesmo e-mail fazem uma consulta só
+principal_lookups: SingleFlight[str, dict[str, Any] | None] = SingleFlight()
+
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.invalidate(email)
+    principal_lookups.forget(email)
 
 
 def create_access_token(data: dict[str, str | datetime]) -> str:
@@ -31,19 +56,147 @@ def create_access_token(data: dict[str, str | datetime]) -> str:
     return encoded_jwt
 
 
+# criado no primeiro hash, não no import
+@cache
+def get_password_context() -> PasswordHash:
+    return PasswordHash((
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    ))
+
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verifica a senha e devolve um novo hash se o custo mudou."""
+    return get_password_context().verify_and_update(
+        plain_password, hashed_password
+    )
+
+
+class PasswordHashPool:
+    """Executa o argon2 fora do event loop, com fila limitada e timeout."""
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        timeout: float,
+        executor: str = 'thread',
+    ) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor_kind = executor
+        self._executor: Executor | None = None
+        # vagas = workers ocupados + jobs aguardando na fila
+        self._slots = BoundedSemaphore(workers + queue_size)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='password-hash',
+                )
+        return self._executor
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Password hashing queue is full',
+                headers={'Retry-After': '1'},
+            )
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout
+            )
+        except TimeoutError:
+            future.cancel()
+            raise HTTPException(
+                status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Password hashing timed out',
+                headers={'Retry-After': '1'},
+            )
+
+    def _release_slot(self, _: Future[Any]) -> None:
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    timeout=settings.PASSWORD_HASH_TIMEOUT,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def get_password_hashes_async(passwords: list[str]) -> list[str]:
+    # no máximo um job por worker, para não estourar a fila do pool
+    limit = asyncio.Semaphore(password_hash_pool.workers)
+
+    async def hash_one(password: str) -> str:
+        async with limit:
+            return await get_password_hash_async(password)
+
+    return list(await asyncio.gather(*map(hash_one, passwords)))
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    return await password_hash_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hash_pool.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
 
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl='auth/token')
 
 
 async def get_current_user(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     token: str = Depends(oauth2_schema),
 ) -> User:
     credentials_exception = HTTPException(
@@ -67,11 +220,23 @@ async def get_current_user(
     except ExpiredSignatureError:
         raise credentials_exception
 
-    user = await session.scalar(
-        select(User).where(User.email == subject_email)
-    )
+    cached = principal_cache.get(subject_email)
+    if cached is None:
 
-    if not user:
-        raise credentials_exception
+        async def lookup() -> dict[str, Any] | None:
+            user = await session.scalar(
+                select(User).where(User.email == subject_email)
+            )
+            return None if user is None else user.model_dump()
+
+        cached = await principal_lookups.do(subject_email, lookup)
+        if cached is None:
+            raise credentials_exception
+
+        principal_cache.set(subject_email, cached)
 
-    return user
+    cached_user = User(**cached)
+    # associa à sessão como se tivesse vindo de uma consulta, sem emitir
+    # SQL; cada request recebe a sua instância, mesmo dividindo a consulta
+    make_transient_to_detached(cached_user)
+    return await session.merge(cached_user, load=False)
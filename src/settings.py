@@ -1,3 +1,7 @@
+from functools import cache
+from typing import Literal
+
+from pydantic import PositiveFloat
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,3 +16,85 @@ class Settings(BaseSettings):
     SECRET_KEY: str = ''
     ALGORITHM: str = ''
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # réplicas de leitura (lista JSON no .env); vazia = tudo no primário
+    READ_DATABASE_URLS: list[str] = []
+
+    # pool onde o argon2 roda, fora do event loop
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_TIMEOUT: float = 5.0
+
+    # custo do argon2; calibre com `python -m src.calibrate`
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # tentativas de login (token bucket) por IP e por e-mail; capacidade
+    # 0 desliga o limite. A recarga precisa ser positiva: é dela que sai o
+    # Retry-After
+    LOGIN_RATE_LIMIT_IP_CAPACITY: int = 20
+    LOGIN_RATE_LIMIT_IP_REFILL_RATE: PositiveFloat = 1.0  # tokens por segundo
+    LOGIN_RATE_LIMIT_EMAIL_CAPACITY: int = 5
+    LOGIN_RATE_LIMIT_EMAIL_REFILL_RATE: PositiveFloat = 0.1
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100_000
+    # proxies cujo X-Forwarded-For é aceito (IPs ou redes, lista JSON no
+    # .env); atrás de um balanceador o endereço dele precisa estar aqui,
+    # senão todos os clientes dividem o bucket do IP do balanceador
+    LOGIN_RATE_LIMIT_TRUSTED_PROXIES: list[str] = []
+
+    # cache do usuário autenticado, por subject do token; 0 desliga
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL: float = 30.0
+
+    # pool de conexões; não se aplica ao SQLite em memória
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    # conexões abertas no startup e espera por conexões em uso no shutdown
+    DATABASE_POOL_PREWARM: int = 5
+    DATABASE_DRAIN_TIMEOUT: float = 10.0
+
+    # PRAGMAs aplicados a cada nova conexão SQLite
+    SQLITE_JOURNAL_MODE: str = 'WAL'
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms
+    SQLITE_CACHE_SIZE: int = -64000  # negativo = KiB
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # limite de itens por chamada de POST /users/bulk
+    USERS_BULK_MAX_ITEMS: int = 1000
+    # limite de ids por chamada de GET /users/batch
+    USERS_BATCH_MAX_IDS: int = 100
+
+    # cache das páginas de GET /users/, invalidado a cada escrita;
+    # tamanho ou ttl 0 desliga. A invalidação só vale no worker que
+    # escreveu: o ttl limita por quanto tempo os outros servem a página
+    # (e a ETag) antigas
+    USERS_LIST_CACHE_SIZE: int = 256
+    USERS_LIST_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    USERS_LIST_CACHE_TTL: float = 2.0  # segundos
+
+    # linhas buscadas por vez no GET /users/export
+    USERS_EXPORT_BATCH_SIZE: int = 1000
+
+    # diagnóstico de queries (log em src.diagnostics); 0 desliga cada um
+    SLOW_QUERY_THRESHOLD: float = 0.5  # segundos
+    REQUEST_STATEMENTS_LIMIT: int = 20
+    REQUEST_REPEATED_STATEMENTS_LIMIT: int = 5
+
+    # compressão das respostas: gzip, e brotli se estiver instalado
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # respostas fixas, comprimidas uma vez no nível máximo e guardadas
+    COMPRESSION_STATIC_PATHS: list[str] = ['/html', '/openapi.json']
+
+
+# um único Settings por processo: cada instância relê o ambiente e o .env
+@cache
+def get_settings() -> Settings:
+    return Settings()
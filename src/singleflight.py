@@ -0,0 +1,73 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+
+class SingleFlight[K, V]:
+    """Junta chamadas concorrentes com a mesma chave numa só execução.
+
+    Quem chega enquanto a primeira chamada ainda está em andamento espera
+    por ela e recebe o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self) -> None:
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                # shield: cancelar quem espera não cancela a chamada dos
+                # outros
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (task and task.cancelling()):
+                    raise
+            # quem executava foi cancelado: tenta de novo, possivelmente
+            # virando o novo executor
+            self.coalesced -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # evita o aviso de exceção nunca lida quando ninguém esperou
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        return result
+
+    def forget(self, key: K) -> None:
+        """Chamadas novas não reaproveitam mais a que está em andamento.
+
+        Usado depois de uma escrita, para que ninguém receba um resultado
+        lido antes dela.
+        """
+        self._calls.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[K], bool]) -> None:
+        for key in [key for key in self._calls if predicate(key)]:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'in_flight': len(self._calls),
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+        }
@@ -6,13 +6,21 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
 from sqlmodel import SQLModel, StaticPool
 
 from src.app import app
-from src.database import get_session
+from src.database import get_session, get_session_factory
+from src.models.task import Task, TaskStatus
 from src.models.user import User
-from src.security import get_password_hash
+from src.ratelimit import login_rate_limiter
+from src.routers.users import list_cache
+from src.security import get_password_hash, principal_cache
 
 
 class UserFactory(factory.Factory):
@@ -24,13 +32,42 @@ class UserFactory(factory.Factory):
     password = factory.LazyAttribute(lambda obj: f'{obj.username}@')
 
 
+class TaskFactory(factory.Factory):
+    class Meta:
+        model = Task  # type: ignore
+
+    title = factory.Sequence(lambda n: f'task {n}')
+    due_date = factory.Sequence(lambda n: datetime(2025, 3, 1 + n % 28))
+
+
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    principal_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _reset_login_rate_limiter():
+    await login_rate_limiter.backend.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _clear_users_list_cache():
+    await list_cache.clear()
+
+
 @pytest.fixture
 def client(session):
     def get_session_override():
         return session
 
+    def get_session_factory_override():
+        return async_sessionmaker(session.bind, expire_on_commit=False)
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_session_factory] = (
+            get_session_factory_override
+        )
         yield client
 
     app.dependency_overrides.clear()
@@ -46,7 +83,7 @@ async def session(mock_db_time):
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
-    async with mock_db_time(model=User):
+    async with mock_db_time(model=User), mock_db_time(model=Task):
         async with AsyncSession(engine, expire_on_commit=False) as session:
             yield session
 
@@ -73,14 +110,50 @@ async def _mock_db_time(
         if hasattr(target, 'updated_at'):
             target.updated_at = update_time
 
+    # insert()/update() executados direto pela sessão não passam pelos
+    # eventos do mapper
+    def fake_statement_time_hook(orm_execute_state):
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.class_ is not model:
+            return
+
+        if orm_execute_state.is_insert:
+            times = {'created_at': create_time, 'updated_at': create_time}
+            if isinstance(orm_execute_state.parameters, list):
+                for params in orm_execute_state.parameters:
+                    params.update(times)
+            else:
+                orm_execute_state.statement = (
+                    orm_execute_state.statement.values(**times)
+                )
+        elif orm_execute_state.is_update:
+            orm_execute_state.statement = orm_execute_state.statement.values(
+                updated_at=update_time
+            )
+
     event.listen(model, 'before_insert', fake_created_time_hook)
     event.listen(model, 'before_update', fake_updated_time_hook)
+    event.listen(Session, 'do_orm_execute', fake_statement_time_hook)
 
     try:
         yield create_time, update_time
     finally:
         event.remove(model, 'before_insert', fake_created_time_hook)
         event.remove(model, 'before_update', fake_updated_time_hook)
+        event.remove(Session, 'do_orm_execute', fake_statement_time_hook)
+
+
+@pytest.fixture
+def statements(session):
+    executed = []
+
+    def record_statement(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', record_statement)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record_statement)
 
 
 @pytest_asyncio.fixture
@@ -114,6 +187,38 @@ async def other_user(session):
     return {'user': user, 'clean_password': password}
 
 
+@pytest_asyncio.fixture
+async def users(session):
+    password = get_password_hash('Test@')
+    users = UserFactory.create_batch(5, password=password)
+    session.add_all(users)
+    await session.commit()
+
+    return users
+
+
+@pytest_asyncio.fixture
+async def tasks(session, user):
+    tasks = [
+        TaskFactory(owner_id=user['user'].id, due_date=datetime(2025, 3, day))
+        for day in (5, 1, 3, 2, 4)
+    ]
+    tasks[2].status = TaskStatus.done
+    session.add_all(tasks)
+    await session.commit()
+
+    return tasks
+
+
+@pytest_asyncio.fixture
+async def other_task(session, other_user):
+    task = TaskFactory(owner_id=other_user['user'].id)
+    session.add(task)
+    await session.commit()
+
+    return task
+
+
 @pytest.fixture
 def token(client, user):
     _user = user['user']
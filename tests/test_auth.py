@@ -1,5 +1,9 @@
+import pytest
 from fastapi import status as http_status
 from freezegun import freeze_time
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from src.security import settings, verify_password
 
 
 def test_get_token(client, user):
@@ -103,3 +107,24 @@ def test_token_expired_dont_refresh(client, user):
         )
         assert response.status_code == http_status.HTTP_401_UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password(client, session, user):
+    _user = user['user']
+    weak_hasher = Argon2Hasher(time_cost=1, memory_cost=8192, parallelism=1)
+    _user.password = weak_hasher.hash(user['clean_password'])
+    await session.commit()
+
+    response = client.post(
+        '/auth/token',
+        data={'username': _user.email, 'password': user['clean_password']},
+    )
+
+    await session.refresh(_user)
+    assert response.status_code == http_status.HTTP_200_OK
+    assert _user.password.startswith(
+        f'$argon2id$v=19$m={settings.ARGON2_MEMORY_COST},'
+        f't={settings.ARGON2_TIME_COST},p={settings.ARGON2_PARALLELISM}$'
+    )
+    assert verify_password(user['clean_password'], _user.password)
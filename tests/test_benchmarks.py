@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.importtime import PROJECT_ROOT
+
+# argumentos mínimos: só confere que cada benchmark ainda roda até o fim
+BENCHMARKS = {
+    'bulk_create': ['--users', '10', '--batch-size', '5'],
+    'cold_start': ['--rounds', '1', '--burst', '2', '--prewarm', '1'],
+    'compression': ['--thresholds', '0', '--users', '5', '--repeat', '1'],
+    'load': ['--users', '4', '--requests', '2', '--concurrency', '1'],
+    'login_concurrency': ['--users', '2', '--logins', '2'],
+    'login_flood': ['--users', '2', '--seconds', '0.5', '--rate', '4'],
+    'pagination': ['--users', '20', '--page', '2', '--limit', '5'],
+    'security': ['--repeat', '1', '--jwt-repeat', '1'],
+    'serialization': ['--limits', '5', '--repeat', '1'],
+}
+
+
+@pytest.mark.parametrize('name', BENCHMARKS)
+def test_benchmark_runs(name):
+    # processo novo: os benchmarks mexem no ambiente, nas Settings e no app
+    result = subprocess.run(
+        [sys.executable, '-m', f'benchmarks.{name}', *BENCHMARKS[name]],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)['benchmark'] == name
@@ -0,0 +1,65 @@
+import pytest
+from freezegun import freeze_time
+
+from src.cache import MemoryResponseCache
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(maxsize=2, max_bytes=1024, ttl=60)
+    await cache.set('a', b'1')
+    await cache.set('b', b'2')
+    await cache.get('a')
+    await cache.set('c', b'3')
+
+    assert await cache.get('a') == b'1'
+    assert await cache.get('b') is None
+    assert await cache.get('c') == b'3'
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_respects_max_bytes():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=10, ttl=60)
+    await cache.set('a', b'x' * 6)
+    await cache.set('b', b'y' * 6)
+    await cache.set('too-big', b'z' * 11)
+
+    assert await cache.get('a') is None
+    assert await cache.get('b') == b'y' * 6
+    assert await cache.get('too-big') is None
+    assert cache.stats()['bytes'] == len(b'y' * 6)
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_bump_generation_drops_entries():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=1024, ttl=60)
+    await cache.set('a', b'1')
+
+    await cache.bump_generation()
+
+    assert await cache.generation() == 1
+    assert len(cache) == 0
+    assert cache.stats()['bytes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_entries_expire():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=1024, ttl=2)
+    with freeze_time() as frozen:
+        await cache.set('a', b'1')
+        frozen.tick(1)
+        assert await cache.get('a') == b'1'
+
+        frozen.tick(1)
+        assert await cache.get('a') is None
+        assert cache.stats()['bytes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_replacing_a_key_keeps_byte_count():
+    cache = MemoryResponseCache(maxsize=10, max_bytes=1024, ttl=60)
+    await cache.set('a', b'x' * 6)
+    await cache.set('a', b'y' * 2)
+
+    assert await cache.get('a') == b'y' * 2
+    assert cache.stats()['bytes'] == len(b'y' * 2)
@@ -0,0 +1,151 @@
+import asyncio
+import zlib
+
+import pytest
+from fastapi import status as http_status
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import (
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+
+from src import compression
+from src.compression import CompressionMiddleware, accepted_encodings
+
+BODY = 'hello compression ' * 200
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+async def text(request):
+    return PlainTextResponse(BODY, headers={'ETag': '"v1"'})
+
+
+async def small(request):
+    return PlainTextResponse('tiny')
+
+
+async def image(request):
+    return Response(BODY.encode(), media_type='image/png')
+
+
+async def stream(request):
+    async def chunks():
+        for n in range(3):
+            yield f'chunk {n}\n'.encode()
+
+    return StreamingResponse(chunks(), media_type='application/x-ndjson')
+
+
+def make_middleware(**kwargs):
+    app = Starlette(
+        routes=[
+            Route('/text', text),
+            Route('/small', small),
+            Route('/image', image),
+            Route('/stream', stream),
+            Route('/static', text),
+        ]
+    )
+    return CompressionMiddleware(app, **kwargs)
+
+
+def make_client(**kwargs):
+    return TestClient(make_middleware(**kwargs))
+
+
+def test_accepted_encodings_ignores_q_zero():
+    assert accepted_encodings('gzip;q=0, br;q=0.5, identity') == {
+        'br',
+        'identity',
+    }
+
+
+def test_gzip_response_above_minimum_size():
+    client = make_client(minimum_size=100)
+
+    response = client.get('/text', headers=GZIP)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'] == 'W/"v1"'
+    assert int(response.headers['Content-Length']) < len(BODY)
+    assert response.text == BODY
+
+
+@pytest.mark.parametrize('path', ['/small', '/image'])
+def test_response_not_compressed(path):
+    client = make_client(minimum_size=100)
+
+    response = client.get(path, headers=GZIP)
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_compressed_chunk_by_chunk():
+    middleware = make_middleware(minimum_size=10_000)
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/stream',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'accept-encoding', b'gzip')],
+    }
+    messages = []
+
+    async def receive():
+        # o cliente nunca desconecta
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+
+    start, *bodies = messages
+    headers = dict(start['headers'])
+    assert headers[b'content-encoding'] == b'gzip'
+    assert b'content-length' not in headers
+    # cada pedaço já descomprime sozinho: nada ficou retido no gzip
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = [decompressor.decompress(body['body']) for body in bodies]
+    assert chunks[:3] == [f'chunk {n}\n'.encode() for n in range(3)]
+
+
+@pytest.mark.skipif(compression.brotli is None, reason='brotli not installed')
+def test_brotli_preferred_when_accepted():
+    client = make_client(minimum_size=100)
+
+    response = client.get('/text', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.text == BODY
+
+
+def test_static_paths_compressed_once(monkeypatch):
+    client = make_client(minimum_size=100, static_paths=['/static'])
+    encoders = []
+    encoder = CompressionMiddleware.encoder
+
+    def counting_encoder(self, encoding, **kwargs):
+        encoders.append(kwargs)
+        return encoder(self, encoding, **kwargs)
+
+    monkeypatch.setattr(CompressionMiddleware, 'encoder', counting_encoder)
+
+    responses = [client.get('/static', headers=GZIP) for _ in range(3)]
+
+    assert encoders == [{'static': True}]
+    assert {response.content for response in responses} == {BODY.encode()}
+
+
+def test_app_compresses_html_page(client):
+    response = client.get('/html', headers=GZIP)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert '<h1>Hello World!</h1>' in response.text
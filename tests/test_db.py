@@ -1,7 +1,23 @@
+import asyncio
+
 import pytest
-from sqlmodel import select
+import pytest_asyncio
+from fastapi import status as http_status
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel, select
 
+from src import database
+from src.database import (
+    Database,
+    build_engine,
+    engine_options,
+    pool_stats,
+    violated_constraint,
+)
 from src.models.user import User
+from src.settings import Settings
 
 
 @pytest.mark.asyncio
@@ -65,3 +81,139 @@ async def test_update_user(session, mock_db_time):
             'created_at': create_time,
             'updated_at': update_time,
         }
+
+
+def test_engine_options_in_memory_sqlite_keeps_static_pool():
+    settings = Settings(DATABASE_URL='sqlite+aiosqlite:///:memory:')
+
+    assert engine_options(settings) == {}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_engine_applies_pragmas_and_reports_pool(tmp_path):
+    settings = Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path / "db.sqlite"}',
+        DATABASE_POOL_SIZE=2,
+        DATABASE_MAX_OVERFLOW=1,
+        SQLITE_BUSY_TIMEOUT=1234,
+    )
+    engine = build_engine(settings)
+
+    async with engine.connect() as conn:
+        journal_mode = await conn.scalar(text('PRAGMA journal_mode'))
+        busy_timeout = await conn.scalar(text('PRAGMA busy_timeout'))
+        stats = pool_stats(engine)
+
+    await engine.dispose()
+
+    assert journal_mode == 'wal'
+    assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT
+    assert stats['capacity'] == settings.DATABASE_POOL_SIZE + 1
+    assert stats['checked_out'] == 1
+    assert stats['checkouts'] == 1
+    assert stats['saturation'] == 1 / stats['capacity']
+
+
+def test_violated_constraint_maps_dialect_errors():
+    class FakeUniqueViolation(Exception):
+        constraint_name = 'ix_users_email'
+
+    sqlite_error = IntegrityError(
+        'INSERT', {}, Exception('UNIQUE constraint failed: users.username')
+    )
+    postgres_error = IntegrityError('INSERT', {}, Exception())
+    postgres_error.orig.__cause__ = FakeUniqueViolation()
+
+    assert violated_constraint(sqlite_error, 'sqlite') == 'ix_users_username'
+    assert violated_constraint(postgres_error, 'postgresql') == (
+        'ix_users_email'
+    )
+    assert violated_constraint(sqlite_error, 'mysql') is None
+
+
+@pytest_asyncio.fixture
+async def replicas(tmp_path, monkeypatch):
+    engines = []
+    for n in range(2):
+        engine = build_engine(
+            Settings(DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path}/r{n}.db')
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            session.add(
+                User(
+                    id=100 + n,
+                    username=f'replica{n}',
+                    email=f'replica{n}@mail.com',
+                    password='x',
+                )
+            )
+            await session.commit()
+        engines.append(engine)
+
+    monkeypatch.setattr(
+        database.db,
+        'read_session_factories',
+        [async_sessionmaker(e, expire_on_commit=False) for e in engines],
+    )
+    yield engines
+
+    for engine in engines:
+        await engine.dispose()
+
+
+def test_get_requests_round_robin_across_replicas(client, replicas):
+    # limites diferentes para não cair na mesma página do cache
+    usernames = {
+        client.get(f'/users/?limit={limit}').json()['users'][0]['username']
+        for limit in (1, 2)
+    }
+
+    assert usernames == {'replica0', 'replica1'}
+
+
+def test_writes_and_their_reads_stay_on_primary(client, user, token, replicas):
+    user_id = user['user'].id
+    # só o primário tem esse usuário
+    assert client.get(f'/users/{user_id}').status_code == (
+        http_status.HTTP_404_NOT_FOUND
+    )
+
+    response = client.patch(
+        f'/users/{user_id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'lele'},
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json()['username'] == 'lele'
+
+
+@pytest.mark.asyncio
+async def test_database_prewarms_pool_and_drains_on_close(tmp_path):
+    database_ = Database()
+    settings = Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path}/db.sqlite',
+        DATABASE_POOL_SIZE=3,
+        DATABASE_POOL_PREWARM=5,
+    )
+    await database_.open(settings)
+    engine = database_.engine
+    pool = engine.pool
+
+    # limitado ao tamanho do pool, e todas ociosas depois do warmup
+    assert pool_stats(engine)['checkouts'] == settings.DATABASE_POOL_SIZE
+    assert pool.checkedin() == settings.DATABASE_POOL_SIZE
+
+    conn = await engine.connect()
+    closing = asyncio.create_task(database_.close(timeout=5))
+    await asyncio.sleep(0.1)
+    assert not closing.done()
+
+    await conn.close()
+    await closing
+
+    assert pool.checkedin() == 0
+    with pytest.raises(RuntimeError, match='Database is not open'):
+        database_.sessions()
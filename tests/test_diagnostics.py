@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+from fastapi import status as http_status
+from sqlalchemy import select, text
+
+from src import metrics
+from src.diagnostics import (
+    RequestDiagnostics,
+    current_request,
+    instrument_engine,
+    parameters_shape,
+)
+from src.models.user import User
+from src.settings import Settings
+
+
+@pytest.fixture
+def diagnose(session):
+    def diagnose(**overrides):
+        instrument_engine(session.bind, Settings(**overrides))
+
+    return diagnose
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape((1, 'secret'), False) == '(int, str)'
+    assert parameters_shape({'email': 'a@a.com'}, False) == '{email: str}'
+    assert parameters_shape([(1,), (2,)], True) == '2 x (int)'
+
+
+def test_slow_query_is_logged_with_route(client, user, diagnose, caplog):
+    diagnose(SLOW_QUERY_THRESHOLD=1e-9)
+
+    with caplog.at_level(logging.WARNING, logger='src.diagnostics'):
+        client.get(f'/users/{user["user"].id}')
+
+    assert any(
+        'slow query' in message
+        and 'GET /users/{user_id}' in message
+        and 'parameters=(int' in message
+        for message in caplog.messages
+    )
+
+
+def test_failed_slow_query_is_logged(client, user, diagnose, caplog):
+    diagnose(SLOW_QUERY_THRESHOLD=1e-9)
+    db_user = user['user']
+
+    with caplog.at_level(logging.WARNING, logger='src.diagnostics'):
+        response = client.post(
+            '/users/',
+            json={
+                'username': db_user.username,
+                'email': 'other@test.com',
+                'password': 'x',
+            },
+        )
+
+    assert response.status_code == http_status.HTTP_409_CONFLICT
+    assert any(
+        'slow failed query' in message and 'POST /users/' in message
+        for message in caplog.messages
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_is_flagged_once(
+    session, users, diagnose, caplog
+):
+    diagnose(REQUEST_REPEATED_STATEMENTS_LIMIT=2)
+    token = current_request.set(
+        RequestDiagnostics({'method': 'GET', 'route': None})
+    )
+
+    with caplog.at_level(logging.WARNING, logger='src.diagnostics'):
+        # um SELECT por usuário: o padrão N+1
+        for user in users:
+            await session.scalar(select(User).where(User.id == user.id))
+    current_request.reset(token)
+
+    flagged = [m for m in caplog.messages if 'possible N+1' in m]
+    assert len(flagged) == 1
+    assert 'GET unmatched' in flagged[0]
+
+
+@pytest.mark.asyncio
+async def test_statement_count_limit(session, diagnose, caplog):
+    diagnose(REQUEST_STATEMENTS_LIMIT=2)
+    request = RequestDiagnostics({'method': 'POST', 'route': None})
+    token = current_request.set(request)
+
+    executed = 3
+
+    with caplog.at_level(logging.WARNING, logger='src.diagnostics'):
+        for value in range(executed):
+            await session.execute(text(f'SELECT {value}'))
+    current_request.reset(token)
+
+    assert request.statements == executed
+    assert any('more than 2 statements' in m for m in caplog.messages)
+
+
+@pytest.mark.asyncio
+async def test_statements_outside_requests_are_not_counted(
+    session, diagnose, caplog
+):
+    diagnose(REQUEST_REPEATED_STATEMENTS_LIMIT=1)
+
+    with caplog.at_level(logging.WARNING, logger='src.diagnostics'):
+        for _ in range(3):
+            await session.execute(text('SELECT 1'))
+
+    assert not caplog.messages
+
+
+def test_statements_are_timed_once_for_metrics_and_diagnostics(session):
+    metrics.instrument_engine(session.bind)
+    instrument_engine(session.bind, Settings())
+
+    listeners = session.bind.sync_engine.dispatch.before_cursor_execute
+
+    assert len(list(listeners)) == 1
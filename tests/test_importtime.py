@@ -0,0 +1,38 @@
+from src.importtime import measure_imports, parse_importtime, summarize
+
+# import de src.app num processo novo; hoje fica perto de 1s, a folga
+# cobre máquinas de CI mais lentas
+STARTUP_BUDGET_MS = 2500
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     sqlalchemy.sql
+import time:       300 |        400 |   sqlalchemy
+import time:        50 |         50 |   src.settings
+import time:      1000 |       1450 | src.app
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(OUTPUT)
+
+    assert [(r.name, r.depth) for r in records] == [
+        ('sqlalchemy.sql', 2),
+        ('sqlalchemy', 1),
+        ('src.settings', 1),
+        ('src.app', 0),
+    ]
+
+
+def test_summarize_groups_self_time_by_package():
+    report = summarize(parse_importtime(OUTPUT), 'src.app', top=1)
+
+    assert report['total_ms'] == 1450 / 1000
+    assert report['packages_ms'] == {'src': 1.05}
+    assert report['slowest_modules_ms'] == {'src.app': 1.0}
+
+
+def test_app_import_fits_startup_budget():
+    report = summarize(measure_imports('src.app'), 'src.app', top=10)
+
+    assert report['total_ms'] < STARTUP_BUDGET_MS, report
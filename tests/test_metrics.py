@@ -0,0 +1,87 @@
+import pytest
+from fastapi import status as http_status
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+
+from src.metrics import Histogram, MetricsRegistry, instrument_engine, metrics
+from src.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.render('h', 'a="b"') == [
+        'h_bucket{a="b",le="0.1"} 2',
+        'h_bucket{a="b",le="1.0"} 3',
+        'h_bucket{a="b",le="+Inf"} 4',
+        'h_sum{a="b"} 2.65',
+        'h_count{a="b"} 4',
+    ]
+
+
+def test_registry_groups_requests_by_route_template():
+    registry = MetricsRegistry()
+
+    class Route:
+        unique_id = 'get_one_user_users__user_id__get'
+        path = '/users/{user_id}'
+
+    route = Route()
+    registry.observe_request(route, 'GET', 200, 0.01)
+    registry.observe_request(route, 'GET', 404, 0.02)
+
+    rendered = registry.render()
+
+    assert (
+        'http_requests_total{method="GET",route="/users/{user_id}",'
+        'status="200"} 1'
+    ) in rendered
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/users/{user_id}"} 2'
+    ) in rendered
+
+
+def test_metrics_endpoint_reports_routes(client, user):
+    client.get(f'/users/{user["user"].id}')
+    client.get('/users/0')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert (
+        'http_requests_total{method="GET",route="/users/{user_id}",'
+        'status="404"} 1'
+    ) in response.text
+    assert 'principal_cache_hits 0' in response.text
+
+
+@pytest.mark.asyncio
+async def test_instrumented_engine_times_statements(session):
+    instrument_engine(session.bind)
+
+    await session.execute(text('SELECT 1'))
+
+    assert metrics.statements['select'].count == 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_engine_times_failed_statements(session, user):
+    instrument_engine(session.bind)
+
+    with pytest.raises(IntegrityError):
+        await session.execute(
+            insert(User).values(
+                username=user['user'].username, email='x@x.com', password='x'
+            )
+        )
+
+    assert metrics.statements['insert'].count == 1
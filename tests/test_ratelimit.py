@@ -0,0 +1,139 @@
+from ipaddress import ip_network
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import Request
+from fastapi import status as http_status
+from fastapi.testclient import TestClient
+from freezegun import freeze_time
+from pydantic import ValidationError
+
+from src.app import app
+from src.ratelimit import (
+    MemoryTokenBucketBackend,
+    TrustedProxies,
+    settings,
+    trusted_proxies,
+)
+from src.routers import auth
+from src.settings import Settings
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time():
+    backend = MemoryTokenBucketBackend(maxsize=10)
+
+    with freeze_time('2025-01-01 00:00:00') as frozen:
+        assert await backend.consume('k', 2, 0.5) == 0
+        assert await backend.consume('k', 2, 0.5) == 0
+        assert await backend.consume('k', 2, 0.5) == pytest.approx(2.0)
+
+        frozen.tick(2)
+        assert await backend.consume('k', 2, 0.5) == 0
+
+
+@pytest.mark.asyncio
+async def test_backend_evicts_least_recently_used_keys():
+    backend = MemoryTokenBucketBackend(maxsize=2)
+
+    for key in ('a', 'b', 'a', 'c'):
+        await backend.consume(key, 1, 1.0)
+
+    assert len(backend) == backend.maxsize
+    # 'b' foi descartado e volta com o bucket cheio
+    assert await backend.consume('b', 1, 1.0) == 0
+    assert await backend.consume('c', 1, 1.0) > 0
+
+
+@pytest.mark.parametrize(
+    'name',
+    ['LOGIN_RATE_LIMIT_IP_REFILL_RATE', 'LOGIN_RATE_LIMIT_EMAIL_REFILL_RATE'],
+)
+def test_refill_rate_must_be_positive(name):
+    # sem recarga o Retry-After dividiria por zero
+    with pytest.raises(ValidationError, match=name):
+        Settings(**{name: 0})
+
+
+def test_login_is_throttled_per_email_before_hashing(client, user):
+    verify = AsyncMock(return_value=(False, None))
+    data = {'username': user['user'].email, 'password': 'wrong'}
+
+    with patch.object(auth, 'verify_and_update_password_async', verify):
+        responses = [
+            client.post('/auth/token', data=data)
+            for _ in range(settings.LOGIN_RATE_LIMIT_EMAIL_CAPACITY + 1)
+        ]
+
+    assert [r.status_code for r in responses[:-1]] == [
+        http_status.HTTP_401_UNAUTHORIZED
+    ] * settings.LOGIN_RATE_LIMIT_EMAIL_CAPACITY
+    assert responses[-1].status_code == http_status.HTTP_429_TOO_MANY_REQUESTS
+    assert responses[-1].json() == {'detail': 'Too many login attempts'}
+    assert int(responses[-1].headers['Retry-After']) > 0
+    assert verify.await_count == settings.LOGIN_RATE_LIMIT_EMAIL_CAPACITY
+
+
+def test_login_is_throttled_per_ip(client):
+    # e-mails distintos: só o limite por IP se aplica
+    responses = [
+        client.post(
+            '/auth/token',
+            data={'username': f'nobody{n}@test.com', 'password': 'x'},
+        )
+        for n in range(settings.LOGIN_RATE_LIMIT_IP_CAPACITY + 1)
+    ]
+
+    assert responses[-2].status_code == http_status.HTTP_401_UNAUTHORIZED
+    assert responses[-1].status_code == http_status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.parametrize(
+    ('peer', 'forwarded_for', 'expected'),
+    [
+        # sem proxy confiável no caminho o cabeçalho é ignorado
+        ('203.0.113.9', '198.51.100.1', '203.0.113.9'),
+        ('10.0.0.1', None, '10.0.0.1'),
+        ('10.0.0.1', '198.51.100.1', '198.51.100.1'),
+        # o da esquerda foi forjado pelo cliente
+        ('10.0.0.1', '192.0.2.66, 198.51.100.1, 10.0.0.2', '198.51.100.1'),
+        ('10.0.0.1', '10.0.0.3, 10.0.0.2', '10.0.0.3'),
+        ('10.0.0.1', 'garbage', 'garbage'),
+    ],
+)
+def test_client_ip_walks_trusted_proxies(peer, forwarded_for, expected):
+    proxies = TrustedProxies(['10.0.0.0/8'])
+    headers = (
+        [(b'x-forwarded-for', forwarded_for.encode())] if forwarded_for else []
+    )
+    request = Request({
+        'type': 'http',
+        'client': (peer, 50000),
+        'headers': headers,
+    })
+
+    assert proxies.client_ip(request) == expected
+
+
+def test_login_behind_proxy_is_throttled_per_forwarded_ip(client, monkeypatch):
+    monkeypatch.setattr(trusted_proxies, 'networks', [ip_network('10.0.0.1')])
+    balancer = TestClient(app, client=('10.0.0.1', 50000))
+
+    def login(n, forwarded_for):
+        return balancer.post(
+            '/auth/token',
+            data={'username': f'nobody{n}@test.com', 'password': 'x'},
+            headers={'X-Forwarded-For': forwarded_for},
+        )
+
+    responses = [
+        login(n, '198.51.100.1')
+        for n in range(settings.LOGIN_RATE_LIMIT_IP_CAPACITY + 1)
+    ]
+
+    assert responses[-1].status_code == http_status.HTTP_429_TOO_MANY_REQUESTS
+    # outro cliente atrás do mesmo balanceador tem o próprio bucket
+    assert (
+        login(0, '198.51.100.2').status_code
+        == http_status.HTTP_401_UNAUTHORIZED
+    )
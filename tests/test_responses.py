@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from src import responses
+from src.models.user import ListUserResponse
+
+
+def test_dump_json_matches_pydantic_output():
+    content = {
+        'users': [
+            {
+                'id': 1,
+                'username': 'lêle',
+                'email': 'lele@mail.com',
+                'created_at': datetime(2025, 1, 1),
+                'updated_at': datetime(2025, 2, 2, 10, 30, 0, 123456),
+            }
+        ],
+        'next_cursor': 'WzFd',
+    }
+
+    assert responses.dump_json(content) == (
+        ListUserResponse.model_validate(content).model_dump_json().encode()
+    )
@@ -1,7 +1,20 @@
+import asyncio
+from threading import Event
+
+import pytest
+from fastapi import HTTPException
 from fastapi import status as http_status
 from jwt import decode
 
-from src.security import create_access_token, settings
+from src.calibrate import MIN_MEMORY_COST, calibrate, write_env
+from src.security import (
+    PasswordHashPool,
+    create_access_token,
+    get_password_hash_async,
+    principal_cache,
+    settings,
+    verify_password_async,
+)
 
 
 def test_jwt():
@@ -55,3 +68,124 @@ def test_get_current_user_UNAUTHORIZED(client):
         == response_noneexistent_user.json()
         == {'detail': 'Could not validate credentials'}
     )
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    hashed = await get_password_hash_async('s&cret')
+
+    assert hashed != 's&cret'
+    assert await verify_password_async('s&cret', hashed)
+    assert not await verify_password_async('wrong', hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_when_queue_is_full():
+    pool = PasswordHashPool(workers=1, queue_size=0, timeout=5)
+    release = Event()
+    busy = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(str, 'next')
+
+    release.set()
+    await busy
+    pool.shutdown()
+
+    assert (
+        exc_info.value.status_code == http_status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    assert exc_info.value.detail == 'Password hashing queue is full'
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_timeout_frees_the_slot():
+    pool = PasswordHashPool(workers=1, queue_size=0, timeout=0.01)
+    release = Event()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.sleep(0.1)
+
+    assert exc_info.value.detail == 'Password hashing timed out'
+    assert await pool.run(str, 'ok') == 'ok'
+    pool.shutdown()
+
+
+def test_get_current_user_is_cached_after_first_lookup(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.post('/auth/refresh-token', headers=headers)
+    second = client.post('/auth/refresh-token', headers=headers)
+
+    assert first.status_code == second.status_code == http_status.HTTP_200_OK
+    assert principal_cache.stats()['misses'] == 1
+    assert principal_cache.stats()['hits'] == 1
+
+
+def test_cached_user_can_be_updated(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh-token', headers=headers)
+
+    response = client.put(
+        f'/users/{user["user"].id}',
+        headers=headers,
+        json={
+            'username': 'cached',
+            'email': 'cached@mail.com',
+            'password': 'n&wp@ss',
+        },
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json()['username'] == 'cached'
+    assert len(principal_cache) == 0
+
+
+def test_deleted_user_is_evicted_from_cache(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.delete(f'/users/{user["user"].id}', headers=headers)
+    response = client.post('/auth/refresh-token', headers=headers)
+
+    assert response.status_code == http_status.HTTP_401_UNAUTHORIZED
+
+
+def test_calibrate_raises_time_cost_up_to_target():
+    # custo proporcional a time_cost x memória: 64 MiB com t=1 leva 0.1s
+    def measure(time_cost, memory_cost, parallelism):
+        return time_cost * memory_cost / 65536 * 0.1
+
+    assert calibrate(
+        0.35, memory_cost=65536, parallelism=4, measure=measure
+    ) == {
+        'ARGON2_TIME_COST': 3,
+        'ARGON2_MEMORY_COST': 65536,
+        'ARGON2_PARALLELISM': 4,
+    }
+
+
+def test_calibrate_lowers_memory_when_target_is_too_small():
+    def measure(time_cost, memory_cost, parallelism):
+        return time_cost * memory_cost / 65536 * 0.1
+
+    values = calibrate(0.03, memory_cost=65536, parallelism=1, measure=measure)
+
+    # 32 MiB ainda passa do alvo, mas 16 MiB ficaria abaixo do mínimo
+    assert values['ARGON2_MEMORY_COST'] == 65536 // 2
+    assert values['ARGON2_MEMORY_COST'] // 2 < MIN_MEMORY_COST
+    assert values['ARGON2_TIME_COST'] == 1
+
+
+def test_write_env_updates_existing_values(tmp_path):
+    env_file = tmp_path / '.env'
+    env_file.write_text('SECRET_KEY=x\nARGON2_TIME_COST=3\n')
+
+    write_env(env_file, {'ARGON2_TIME_COST': 2, 'ARGON2_MEMORY_COST': 19456})
+
+    assert env_file.read_text() == (
+        'SECRET_KEY=x\nARGON2_TIME_COST=2\nARGON2_MEMORY_COST=19456\n'
+    )
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 'value'
+
+    waiters = [asyncio.create_task(flights.do('key', fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ['value'] * 3
+    assert calls == 1
+    assert flights.stats() == {'in_flight': 0, 'executed': 1, 'coalesced': 2}
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_waiter():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        raise ValueError('boom')
+
+    waiters = [asyncio.create_task(flights.do('key', fetch)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_waiter():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 'value'
+
+    leader = asyncio.create_task(flights.do('key', fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flights.do('key', fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == 'value'
+    assert leader.cancelled()
+    # a execução cancelada e a do sucessor
+    assert flights.stats()['executed'] == len((leader, waiter))
+
+
+@pytest.mark.asyncio
+async def test_forget_starts_a_new_execution():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    results = iter(['before write', 'after write'])
+
+    async def fetch():
+        value = next(results)
+        await release.wait()
+        return value
+
+    stale = asyncio.create_task(flights.do('key', fetch))
+    await asyncio.sleep(0)
+    flights.forget('key')
+    fresh = asyncio.create_task(flights.do('key', fetch))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await stale == 'before write'
+    assert await fresh == 'after write'
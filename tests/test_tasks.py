@@ -0,0 +1,193 @@
+import pytest
+from fastapi import status as http_status
+from sqlalchemy import text
+
+from src.models.pagination import encode_cursor
+from src.models.task import TaskFilterPage, TaskStatus
+from src.routers.tasks import tasks_list_query
+
+
+async def query_plan(session, query):
+    compiled = query.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={'literal_binds': True},
+    )
+    result = await session.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))
+    return ' | '.join(row.detail for row in result)
+
+
+def test_create_task(client, user, token):
+    response = client.post(
+        '/tasks/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'write tests', 'due_date': '2025-03-10T12:00:00'},
+    )
+
+    assert response.status_code == http_status.HTTP_201_CREATED
+    assert response.json() == {
+        'id': 1,
+        'title': 'write tests',
+        'status': 'todo',
+        'due_date': '2025-03-10T12:00:00',
+        'created_at': '2025-01-01T00:00:00',
+        'updated_at': '2025-01-01T00:00:00',
+    }
+
+
+def test_create_task_should_return_UNAUTHORIZED(client):
+    response = client.post(
+        '/tasks/', json={'title': 'x', 'due_date': '2025-03-10T12:00:00'}
+    )
+
+    assert response.status_code == http_status.HTTP_401_UNAUTHORIZED
+
+
+def test_get_tasks_list_returns_open_tasks_by_due_date(client, tasks, token):
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {token}'}
+    )
+    titles = [task['title'] for task in response.json()['tasks']]
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert titles == [tasks[i].title for i in (1, 3, 4, 0)]
+    assert 'next_cursor' not in response.json()
+
+
+def test_get_tasks_list_filtered_by_status(client, tasks, token):
+    response = client.get(
+        '/tasks/',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'status': 'done'},
+    )
+
+    assert [task['id'] for task in response.json()['tasks']] == [tasks[2].id]
+
+
+def test_get_tasks_list_walk_with_cursor(client, tasks, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'limit': 3}
+    seen = []
+
+    while True:
+        page = client.get('/tasks/', headers=headers, params=params).json()
+        seen.extend(task['id'] for task in page['tasks'])
+        if 'next_cursor' not in page:
+            break
+        params['cursor'] = page['next_cursor']
+
+    assert seen == [tasks[i].id for i in (1, 3, 4, 0)]
+
+
+@pytest.mark.parametrize(
+    'values',
+    [
+        ('not-a-date', 1),
+        ('2025-03-02T00:00:00', True),
+        # não cabe num inteiro de 64 bits: o driver estouraria com 500
+        ('2025-03-02T00:00:00', 10**30),
+    ],
+)
+def test_get_tasks_list_invalid_cursor(client, token, values):
+    response = client.get(
+        '/tasks/',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'cursor': encode_cursor(*values)},
+    )
+
+    assert response.status_code == http_status.HTTP_400_BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_get_tasks_list_is_scoped_to_current_user(
+    client, other_task, tasks, token
+):
+    response = client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert len(response.json()['tasks']) == len(tasks) - 1
+
+
+def test_get_one_task(client, tasks, token):
+    response = client.get(
+        f'/tasks/{tasks[0].id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json()['title'] == tasks[0].title
+
+
+def test_get_one_task_of_other_user_should_return_NOT_FOUND(
+    client, other_task, token
+):
+    response = client.get(
+        f'/tasks/{other_task.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == http_status.HTTP_404_NOT_FOUND
+    assert response.json() == {'detail': 'Task not found'}
+
+
+def test_update_task(client, tasks, token):
+    response = client.put(
+        f'/tasks/{tasks[0].id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'title': 'renamed',
+            'status': 'doing',
+            'due_date': '2025-04-01T00:00:00',
+        },
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json() == {
+        'id': tasks[0].id,
+        'title': 'renamed',
+        'status': 'doing',
+        'due_date': '2025-04-01T00:00:00',
+        'created_at': '2025-01-01T00:00:00',
+        'updated_at': '2025-02-02T00:00:00',
+    }
+
+
+def test_delete_task(client, tasks, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.delete(f'/tasks/{tasks[0].id}', headers=headers)
+    response_after = client.get(f'/tasks/{tasks[0].id}', headers=headers)
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json() == {'message': 'Task deleted'}
+    assert response_after.status_code == http_status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('filter_tasks', 'index'),
+    [
+        (TaskFilterPage(), 'ix_tasks_owner_id_open_due_date'),
+        (
+            TaskFilterPage(cursor=encode_cursor('2025-03-02T00:00:00', 2)),
+            'ix_tasks_owner_id_open_due_date',
+        ),
+        (
+            TaskFilterPage(status=TaskStatus.done),
+            'ix_tasks_owner_id_status_due_date',
+        ),
+        (
+            TaskFilterPage(
+                status=TaskStatus.todo,
+                cursor=encode_cursor('2025-03-02T00:00:00', 2),
+            ),
+            'ix_tasks_owner_id_status_due_date',
+        ),
+    ],
+)
+async def test_tasks_list_query_uses_index(session, filter_tasks, index):
+    plan = await query_plan(session, tasks_list_query(1, filter_tasks))
+
+    assert f'USING INDEX {index}' in plan
+    # nem varredura da tabela, nem ordenação em memória
+    assert 'SCAN' not in plan
+    assert 'TEMP B-TREE' not in plan
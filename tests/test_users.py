@@ -1,6 +1,23 @@
+import asyncio
+import csv
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
 from fastapi import status as http_status
+from freezegun import freeze_time
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-# TODO: test para get_users_list com offset e limit
+from src.app import app
+from src.database import get_session, get_session_factory
+from src.etag import make_etag
+from src.models.pagination import encode_cursor
+from src.models.user import User
+from src.routers import users as users_router
 
 
 def test_create_user(client):
@@ -19,13 +36,27 @@ def test_create_user(client):
     }
 
 
+def test_create_user_is_a_single_statement(client, statements):
+    response = client.post(
+        '/users/',
+        json={'username': 'lex', 'email': 'lex@dev.com', 'password': 'secr&t'},
+    )
+
+    assert response.status_code == http_status.HTTP_201_CREATED
+    assert len(statements) == 1
+    assert statements[0].startswith('INSERT INTO users')
+    assert 'RETURNING' in statements[0]
+
+
 def test_create_user_integrity_error(client, user):
     _user = user['user']
+    # o rollback do conflito expira os objetos da sessão compartilhada
+    username, email = _user.username, _user.email
 
     response_username = client.post(
         '/users/',
         json={
-            'username': _user.username,
+            'username': username,
             'email': 'tester@test.com',
             'password': 'Test@0',
         },
@@ -34,7 +65,7 @@ def test_create_user_integrity_error(client, user):
         '/users/',
         json={
             'username': 'Tester0',
-            'email': _user.email,
+            'email': email,
             'password': 'Test@0',
         },
     )
@@ -48,6 +79,63 @@ def test_create_user_integrity_error(client, user):
     assert response_email.json() == {'detail': 'email already exists'}
 
 
+def test_create_users_bulk(client, user):
+    _user = user['user']
+
+    response = client.post(
+        '/users/bulk',
+        json=[
+            {'username': 'ana', 'email': 'ana@dev.com', 'password': 'p@ss'},
+            {
+                'username': _user.username,
+                'email': 'other@dev.com',
+                'password': 'p@ss',
+            },
+            {'username': 'bia', 'email': _user.email, 'password': 'p@ss'},
+            {'username': 'ana', 'email': 'ana2@dev.com', 'password': 'p@ss'},
+            {'username': 'caio', 'email': 'caio@dev.com', 'password': 'p@ss'},
+        ],
+    )
+    results = response.json()['results']
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert [result['status'] for result in results] == [
+        'created',
+        'conflict',
+        'conflict',
+        'conflict',
+        'created',
+    ]
+    assert results[0]['user']['username'] == 'ana'
+    assert results[4]['user']['email'] == 'caio@dev.com'
+    assert results[1]['detail'] == 'username already exists'
+    assert results[2]['detail'] == 'email already exists'
+    assert results[3]['detail'] == 'username already exists'
+
+    listed = client.get('/users/').json()['users']
+    assert {user['username'] for user in listed} == {
+        _user.username,
+        'ana',
+        'caio',
+    }
+
+
+def test_create_users_bulk_too_many(client, monkeypatch):
+    monkeypatch.setattr(users_router.settings, 'USERS_BULK_MAX_ITEMS', 1)
+
+    response = client.post(
+        '/users/bulk',
+        json=[
+            {'username': 'ana', 'email': 'ana@dev.com', 'password': 'p@ss'},
+            {'username': 'bia', 'email': 'bia@dev.com', 'password': 'p@ss'},
+        ],
+    )
+
+    assert (
+        response.status_code == http_status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    )
+
+
 def test_get_user_list_empty(client):
     response = client.get('/users/')
 
@@ -63,6 +151,68 @@ def test_get_user_list_with_users(client, user):
     assert response.json() == {'users': [user_json]}
 
 
+def test_get_user_list_with_offset_and_limit(client, users):
+    response = client.get('/users/', params={'offset': 1, 'limit': 2})
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert [user['id'] for user in response.json()['users']] == [
+        users[1].id,
+        users[2].id,
+    ]
+    assert 'next_cursor' in response.json()
+
+
+def test_get_user_list_walk_with_cursor(client, users):
+    seen = []
+    params = {'limit': 2}
+
+    while True:
+        response = client.get('/users/', params=params)
+        assert response.status_code == http_status.HTTP_200_OK
+
+        page = response.json()
+        seen.extend(user['id'] for user in page['users'])
+        if 'next_cursor' not in page:
+            break
+        params['cursor'] = page['next_cursor']
+
+    assert seen == [user.id for user in users]
+
+
+def test_get_user_list_last_page_without_cursor(client, users):
+    response = client.get('/users/', params={'limit': len(users)})
+
+    assert len(response.json()['users']) == len(users)
+    assert 'next_cursor' not in response.json()
+
+
+def test_get_user_list_openapi_schema(client):
+    schema = client.get('/openapi.json').json()
+    responses = schema['paths']['/users/']['get']['responses']
+
+    assert responses['200']['content']['application/json']['schema'] == {
+        '$ref': '#/components/schemas/ListUserResponse'
+    }
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    [
+        'not-a-cursor',
+        encode_cursor('1'),
+        encode_cursor(True),
+        # não cabe num inteiro de 64 bits: o driver estouraria com 500
+        encode_cursor(2**63),
+        encode_cursor(10**30),
+    ],
+)
+def test_get_user_list_invalid_cursor(client, cursor):
+    response = client.get('/users/', params={'cursor': cursor})
+
+    assert response.status_code == http_status.HTTP_400_BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
 def test_get_user_should_return_OK(client, user):
     _user = user['user']
     response = client.get(f'/users/{user["user"].id}')
@@ -77,6 +227,76 @@ def test_get_user_should_return_OK(client, user):
     }
 
 
+def test_get_users_batch(client, users, statements):
+    first, second = users[0].id, users[1].id
+    missing = second + 1000
+
+    response = client.get(
+        '/users/batch',
+        params={'ids': [second, missing, first, second]},
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    data = response.json()
+    assert list(data['users']) == [str(second), str(first)]
+    assert data['users'][str(first)]['username'] == users[0].username
+    assert data['missing'] == [missing]
+    assert len(statements) == 1
+
+
+def test_get_users_batch_too_many_ids(client, monkeypatch):
+    monkeypatch.setattr(users_router.settings, 'USERS_BATCH_MAX_IDS', 1)
+
+    response = client.get('/users/batch', params={'ids': [1, 2]})
+
+    assert response.status_code == http_status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_users_batch_requires_ids(client):
+    response = client.get('/users/batch')
+
+    assert response.status_code == http_status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_user_with_fields_selects_only_them(client, user, statements):
+    url = f'/users/{user["user"].id}'
+    etag = client.get(url).headers['ETag']
+    statements.clear()
+
+    response = client.get(url, params={'fields': 'username,id'})
+
+    assert response.json() == {
+        'id': user['user'].id,
+        'username': user['user'].username,
+    }
+    assert response.headers['ETag'] != etag
+    (statement,) = statements
+    assert 'email' not in statement
+    assert 'created_at' not in statement
+
+
+def test_get_user_unknown_field(client, user):
+    response = client.get(
+        f'/users/{user["user"].id}', params={'fields': 'id,password'}
+    )
+
+    assert response.status_code == http_status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Unknown fields: password'}
+
+
+def test_get_user_list_with_fields(client, users):
+    full = client.get('/users/?limit=2')
+    sparse = client.get('/users/?limit=2&fields=username')
+
+    assert sparse.json()['users'] == [
+        {'username': user.username} for user in users[:2]
+    ]
+    assert 'next_cursor' in sparse.json()
+    assert sparse.headers['ETag'] != full.headers['ETag']
+    # o cache separa as páginas pelos campos pedidos
+    assert client.get('/users/?limit=2').content == full.content
+
+
 def test_get_user_should_return_NOT_FOUND(client, user):
     response = client.get('/users/0')
 
@@ -84,6 +304,188 @@ def test_get_user_should_return_NOT_FOUND(client, user):
     assert response.json() == {'detail': 'User not found'}
 
 
+def test_get_user_if_none_match_returns_NOT_MODIFIED(client, user, statements):
+    url = f'/users/{user["user"].id}'
+    etag = client.get(url).headers['ETag']
+    statements.clear()
+
+    response = client.get(url, headers={'If-None-Match': etag})
+
+    assert response.status_code == http_status.HTTP_304_NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+    # só updated_at é lido; a linha não é carregada
+    assert len(statements) == 1
+    assert statements[0].startswith('SELECT users.updated_at \nFROM users')
+
+
+def test_get_user_etag_changes_after_update(client, user, token):
+    url = f'/users/{user["user"].id}'
+    etag = client.get(url).headers['ETag']
+
+    client.patch(
+        url,
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'lele'},
+    )
+    response = client.get(url, headers={'If-None-Match': etag})
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.headers['ETag'] != etag
+    assert response.json()['username'] == 'lele'
+
+
+@pytest.mark.asyncio
+async def test_updates_in_the_same_second_change_updated_at(session, user):
+    table = User.__table__
+    user_id = user['user'].id
+
+    # Core direto: o mock de horário da conftest só age em execuções do ORM
+    async with session.bind.begin() as conn:
+        versions = []
+        for username in ('first', 'second'):
+            await conn.execute(
+                update(table)
+                .where(table.c.id == user_id)
+                .values(username=username)
+            )
+            versions.append(
+                await conn.scalar(
+                    select(table.c.updated_at).where(table.c.id == user_id)
+                )
+            )
+
+    first, second = versions
+    assert first < second
+    assert make_etag(user_id, first) != make_etag(user_id, second)
+
+
+@pytest.mark.asyncio
+async def test_insert_and_update_timestamps_use_the_app_clock(session):
+    table = User.__table__
+    created = datetime(2025, 3, 3, 12, 0, 0, 123456)
+
+    # Core direto: o mock de horário da conftest só age em execuções do ORM
+    async with session.bind.begin() as conn:
+        with freeze_time(created) as frozen:
+            result = await conn.execute(
+                insert(table).values(
+                    username='clock', email='clock@test.com', password='x'
+                )
+            )
+            (user_id,) = result.inserted_primary_key
+            inserted = (
+                await conn.execute(
+                    select(table.c.created_at, table.c.updated_at).where(
+                        table.c.id == user_id
+                    )
+                )
+            ).one()
+
+            frozen.tick(0.5)
+            await conn.execute(
+                update(table)
+                .where(table.c.id == user_id)
+                .values(username='clock2')
+            )
+            updated_at = await conn.scalar(
+                select(table.c.updated_at).where(table.c.id == user_id)
+            )
+
+    assert tuple(inserted) == (created, created)
+    assert updated_at == created + timedelta(seconds=0.5)
+
+
+def test_get_user_list_if_none_match(client, users):
+    etag = client.get('/users/?limit=2').headers['ETag']
+
+    not_modified = client.get(
+        '/users/?limit=2', headers={'If-None-Match': f'W/{etag}, "other"'}
+    )
+    other_page = client.get('/users/?limit=3', headers={'If-None-Match': etag})
+
+    assert not_modified.status_code == http_status.HTTP_304_NOT_MODIFIED
+    assert other_page.status_code == http_status.HTTP_200_OK
+    assert other_page.headers['ETag'] != etag
+
+
+class SharedListCache:
+    """Fake de um store compartilhado: sem LRU, só chave, valor e geração."""
+
+    def __init__(self):
+        self.data = {}
+        self.generation_value = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def generation(self):
+        return self.generation_value
+
+    async def bump_generation(self):
+        self.generation_value += 1
+
+    async def clear(self):
+        self.data.clear()
+
+    def stats(self):
+        return {'size': len(self.data)}
+
+
+def test_get_user_list_cached_page_skips_database(client, users, statements):
+    first = client.get('/users/?limit=2')
+    statements.clear()
+
+    second = client.get('/users/?limit=2')
+    not_modified = client.get(
+        '/users/?limit=2', headers={'If-None-Match': first.headers['ETag']}
+    )
+
+    assert second.content == first.content
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert not_modified.status_code == http_status.HTTP_304_NOT_MODIFIED
+    assert statements == []
+
+
+@pytest.mark.parametrize('backend', ['memory', 'shared'])
+def test_get_user_list_cache_invalidated_by_writes(
+    client, user, token, monkeypatch, backend
+):
+    if backend == 'shared':
+        monkeypatch.setattr(users_router, 'list_cache', SharedListCache())
+    db_user = user['user']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def usernames():
+        response = client.get('/users/')
+        return [item['username'] for item in response.json()['users']]
+
+    assert usernames() == [db_user.username]
+
+    client.post(
+        '/users/',
+        json={'username': 'bob', 'email': 'bob@test.com', 'password': 'x'},
+    )
+    assert usernames() == [db_user.username, 'bob']
+
+    client.put(
+        f'/users/{db_user.id}',
+        headers=headers,
+        json={
+            'username': 'alice',
+            'email': db_user.email,
+            'password': user['clean_password'],
+        },
+    )
+    assert usernames() == ['alice', 'bob']
+
+    client.delete(f'/users/{db_user.id}', headers=headers)
+    assert usernames() == ['bob']
+
+
 def test_update_user_should_return_OK(client, user, token):
     user_id = user['user'].id
     response = client.put(
@@ -105,6 +507,28 @@ def test_update_user_should_return_OK(client, user, token):
     }
 
 
+def test_update_user_is_a_single_statement(client, user, token, statements):
+    headers = {'Authorization': f'Bearer {token}'}
+    # aquece o cache do usuário autenticado
+    client.post('/auth/refresh-token', headers=headers)
+    statements.clear()
+
+    response = client.put(
+        f'/users/{user["user"].id}',
+        headers=headers,
+        json={
+            'username': 'lele',
+            'email': 'lele@mail.com',
+            'password': 'n&wp@ssword',
+        },
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert len(statements) == 1
+    assert statements[0].startswith('UPDATE users')
+    assert 'RETURNING' in statements[0]
+
+
 def test_update_user_should_return_UNAUTHORIZED(client, user):
     user_id = user['user'].id
     response = client.put(
@@ -169,6 +593,88 @@ def test_update_user_integrity_error_email(client, user, other_user, token):
     assert response.json() == {'detail': 'email already exists'}
 
 
+def test_patch_user_only_username_skips_hashing(
+    client, user, token, statements, monkeypatch
+):
+    async def fail_hash(password):
+        raise AssertionError('password should not be hashed')
+
+    monkeypatch.setattr(users_router, 'get_password_hash_async', fail_hash)
+    user_id = user['user'].id
+
+    response = client.patch(
+        f'/users/{user_id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'lele'},
+    )
+    update_statement = statements[-1]
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json() == {
+        'id': user_id,
+        'username': 'lele',
+        'email': user['user'].email,
+        'created_at': '2025-01-01T00:00:00',
+        'updated_at': '2025-02-02T00:00:00',
+    }
+    assert update_statement.startswith('UPDATE users SET username=')
+    assert 'password' not in update_statement.split('RETURNING')[0]
+    assert 'email' not in update_statement.split('RETURNING')[0]
+
+
+def test_patch_user_password(client, user, token):
+    _user = user['user']
+    email = _user.email
+
+    response = client.patch(
+        f'/users/{_user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'password': 'n&wp@ss'},
+    )
+    response_login = client.post(
+        '/auth/token', data={'username': email, 'password': 'n&wp@ss'}
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response_login.status_code == http_status.HTTP_200_OK
+
+
+def test_patch_user_without_changes(client, user, token, statements):
+    statements.clear()
+
+    response = client.patch(
+        f'/users/{user["user"].id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={},
+    )
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.json()['username'] == user['user'].username
+    assert not any(s.startswith('UPDATE') for s in statements)
+
+
+def test_patch_user_integrity_error(client, user, other_user, token):
+    response = client.patch(
+        f'/users/{user["user"].id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'email': other_user['user'].email},
+    )
+
+    assert response.status_code == http_status.HTTP_409_CONFLICT
+    assert response.json() == {'detail': 'email already exists'}
+
+
+def test_patch_user_should_return_FORBIDDEN(client, other_user, token):
+    response = client.patch(
+        f'/users/{other_user["user"].id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'lele'},
+    )
+
+    assert response.status_code == http_status.HTTP_403_FORBIDDEN
+    assert response.json() == {'detail': 'Not enough permissions'}
+
+
 def test_delete_user_should_return_OK(client, user, token):
     user_id = user['user'].id
 
@@ -198,3 +704,130 @@ def test_delete_user_should_return_FORBIDDEN(client, other_user, token):
 
     assert response.status_code == http_status.HTTP_403_FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_export_users_ndjson(client, users):
+    response = client.get('/users/export')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert lines == [
+        user.model_dump(mode='json', exclude='password') for user in users
+    ]
+
+
+def test_export_users_csv(client, users):
+    response = client.get('/users/export', params={'format': 'csv'})
+    rows = list(csv.reader(io.StringIO(response.text)))
+
+    assert response.status_code == http_status.HTTP_200_OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert rows[0] == ['id', 'username', 'email', 'created_at', 'updated_at']
+    assert [row[1] for row in rows[1:]] == [user.username for user in users]
+
+
+def current_rss():
+    with open('/proc/self/statm', encoding='utf-8') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@pytest.mark.skipif(
+    not os.path.exists('/proc/self/statm'), reason='needs /proc (Linux)'
+)
+@pytest.mark.asyncio
+async def test_export_users_memory_stays_bounded(session):
+    total_users = 500_000
+    batch_size = 10_000
+    rss_growth_limit = 32 * 1024 * 1024
+
+    for start in range(0, total_users, batch_size):
+        await session.execute(
+            insert(User),
+            [
+                {'username': f'u{n}', 'email': f'u{n}@t.com', 'password': 'x'}
+                for n in range(start, start + batch_size)
+            ],
+        )
+    await session.commit()
+
+    app.dependency_overrides[get_session_factory] = lambda: (
+        async_sessionmaker(session.bind, expire_on_commit=False)
+    )
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/users/export',
+        'raw_path': b'/users/export',
+        'root_path': '',
+        'query_string': b'format=ndjson',
+        'headers': [],
+        'client': ('test', 0),
+        'server': ('test', 80),
+    }
+    baseline_rss = current_rss()
+    sent = {'bytes': 0, 'lines': 0, 'peak_rss': baseline_rss}
+
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # a StreamingResponse fica ouvindo por um disconnect
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        # descarta o corpo: só a memória do servidor é medida
+        if message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            sent['bytes'] += len(body)
+            sent['lines'] += body.count(b'\n')
+            sent['peak_rss'] = max(sent['peak_rss'], current_rss())
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+        app.dependency_overrides.clear()
+
+    assert sent['lines'] == total_users
+    assert sent['bytes'] > 2 * rss_growth_limit
+    assert sent['peak_rss'] - baseline_rss < rss_growth_limit
+
+
+@pytest.mark.asyncio
+async def test_get_user_concurrent_requests_share_one_query(
+    session, user, statements
+):
+    requests = 1000
+    factory = async_sessionmaker(session.bind, expire_on_commit=False)
+
+    # uma sessão por request, como em produção
+    async def get_session_override():
+        async with factory() as request_session:
+            yield request_session
+
+    app.dependency_overrides[get_session] = get_session_override
+    lookups = users_router.user_lookups
+    executed, coalesced = lookups.executed, lookups.coalesced
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url='http://test'
+        ) as client:
+            responses = await asyncio.gather(
+                *(
+                    client.get(f'/users/{user["user"].id}')
+                    for _ in range(requests)
+                )
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert {response.status_code for response in responses} == {
+        http_status.HTTP_200_OK
+    }
+    assert len(statements) == 1
+    assert lookups.executed - executed == 1
+    assert lookups.coalesced - coalesced == requests - 1